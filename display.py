@@ -1,11 +1,14 @@
 from itertools import repeat
 from model.base import *
-from PIL import Image, ImageDraw
-from IPython.display import display, clear_output
+from model.metrics import Metrics, measure
 import time
-from typing import Tuple, List, Final
+from typing import Tuple, List, Final, Sequence, TYPE_CHECKING
 from helpers import percentage
 
+# PIL and IPython take a while to import, so they are only imported once something actually gets drawn or displayed. This keeps scripts which never draw anything (like `simulate.py` without `--frames`) quick to start
+if TYPE_CHECKING:
+    from PIL import Image
+
 
 class CantColourSpeciesError(Exception):
     def __init__(self, species: Species):
@@ -29,25 +32,46 @@ def colourmap(species: Species) -> Colour:
         raise CantColourSpeciesError(species)
 
 
+def draw_cells(
+    cells: Sequence[int], width: int, height: int, img_width: int, img_height: int
+) -> "Image.Image":
+    """
+    Draws the cells of a board given in the same format as `Board.get_cell_buffer()`, without any of the decorations `draw_board()` adds
+    """
+
+    from PIL import Image
+
+    if img_width < width or img_height < height:
+        raise ValueError("Image cannot be smaller than the board itself")
+
+    # We first create the image that we are going to print out (allbeit a very small version of it where each cell is only one pixel)
+    img: Image.Image = Image.new("RGB", (width, height))
+    for i in range(width):
+        for j in range(height):
+            species: int = cells[j * width + i]
+            img.putpixel((i, j), colourmap(None if species < 0 else species))
+
+    # We then resize the image to its full size (as specified by the arguments `img_width` and `img_height`), using box resampling so it stays pixelated
+    return img.resize((img_width, img_height), resample=Image.BOX)
+
+
 def draw_board(
     board: Board,
     img_width: int,
     img_height: int,
     border_params: Tuple[int, int, int, int] | None = None,
     tail_length: int = 0,
-) -> Image.Image:
+) -> "Image.Image":
 
-    if img_width < board.get_width() or img_height < board.get_height():
-        raise ValueError("Image cannot be smaller than the board itself")
-
-    # We first create the image that we are going to print out (allbeit a very small version of it where each cell is only one pixel)
-    img: Image.Image = Image.new("RGB", (board.get_width(), board.get_height()))
-    for i in range(board.get_width()):
-        for j in range(board.get_height()):
-            img.putpixel((i, j), colourmap(board[(i, j)]))
+    from PIL import ImageDraw
 
-    # We then resize the image to its full size (as specified by the arguments `img_width` and `img_height`), using box resampling so it stays pixelated
-    img = img.resize((img_width, img_height), resample=Image.BOX)
+    img: Image.Image = draw_cells(
+        board.get_cell_buffer(),
+        board.get_width(),
+        board.get_height(),
+        img_width,
+        img_height,
+    )
 
     # We will now start drawing on our image
     drawing: ImageDraw.ImageDraw = ImageDraw.Draw(img)
@@ -95,18 +119,25 @@ def draw_board(
         except IndexError:
             pass
 
-    # We finally print a little message on the top-right showing the percentage of satisfied agents and the mean conspecificity
+    # We finally print a little message on the top-right showing the percentage of satisfied agents and the mean conspecificity. All the stats come from a single pass over the board
+    metrics: Metrics = measure(board)
     drawing.text(
         (10, 0),
         "Satisfied: "
         + (
             "everyone"
-            if board.get_total_satisfied() == board.get_total_population()
-            else percentage(board.get_proportion_satisfied())
+            if metrics.get_total_satisfied() == board.get_total_population()
+            else percentage(
+                metrics.get_total_satisfied() / board.get_total_population()
+            )
         ),
     )
     drawing.text(
-        (10, 10), f"Mean Conspecificity: {percentage(board.mean_conspecificity())}"
+        (10, 10), f"Mean Conspecificity: {percentage(metrics.mean_conspecificity)}"
+    )
+    drawing.text(
+        (10, 20),
+        f"Dissimilarity: {percentage(max(metrics.dissimilarity_by_species))}",
     )
 
     # Congradulations! We're done :)
@@ -124,11 +155,13 @@ def animate_schelling(
     outfile_name: str | None = None,
 ) -> None:
 
+    from IPython.display import display, clear_output
+
     if delay < 0:
         raise ValueError("Delay cannot be negative")
 
     # We will record all the images we display so we can make them into a gif after
-    history: List[Image.Image] = list()
+    history: List["Image.Image"] = list()
 
     # This for-loop probably looks kind of complicated, but all really all we're saying is do to this `max_iter` times unless `max_iter` is None, in which case just do it forever (or at least until it's broken by something like a keyboard interupt)
     for _ in repeat(None) if max_iter is None else range(max_iter):
@@ -1,7 +1,9 @@
-from typing import Callable, TypeVar, Iterable, Iterator, List
+from typing import Callable, Dict, Generic, Hashable, TypeVar, Iterable, Iterator, List
+from random import randrange
 
 A = TypeVar("A")
 B = TypeVar("B")
+H = TypeVar("H", bound=Hashable)
 
 # def count(pred: Callable[[A], bool], iter: Iterable[A]):
 #     """
@@ -41,3 +43,49 @@ def percentage(p: float) -> str:
     Displays p as a whole-number percentage
     """
     return f"{round(100 * p)}%"
+
+
+class IndexedSet(Generic[H]):
+    """
+    A set which, on top of adding, removing and checking for elements in constant time, can also pick a uniformly random element in constant time
+
+    The elements are kept in a list, along with a dictionary of where each one is in that list. Removing an element moves the last element of the list into its place so there are never any gaps
+    """
+
+    def __init__(self, elements: Iterable[H] = ()):
+        self._elements: List[H] = list()
+        self._positions: Dict[H, int] = dict()
+        for e in elements:
+            self.add(e)
+
+    def __len__(self) -> int:
+        return len(self._elements)
+
+    def __contains__(self, e: object) -> bool:
+        return e in self._positions
+
+    def __iter__(self) -> Iterator[H]:
+        return iter(self._elements)
+
+    def add(self, e: H) -> None:
+        if e not in self._positions:
+            self._positions[e] = len(self._elements)
+            self._elements.append(e)
+
+    def discard(self, e: H) -> None:
+        try:
+            position: int = self._positions.pop(e)
+        except KeyError:
+            return
+        last: H = self._elements.pop()
+        if position < len(self._elements):
+            self._elements[position] = last
+            self._positions[last] = position
+
+    def choice(self) -> H:
+        """
+        Returns a uniformly random element of the set
+        """
+        if not self._elements:
+            raise IndexError("Cannot choose from an empty set")
+        return self._elements[randrange(len(self._elements))]
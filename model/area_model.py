@@ -1,7 +1,13 @@
 from random import shuffle, random
 from array import array
-from typing import Iterable, cast, List, Tuple, Iterator, Final
+from typing import Iterable, cast, List, Tuple, Iterator, Final, TYPE_CHECKING
 from model.base import *
+from model.summed_area import SummedAreaTables
+
+if TYPE_CHECKING:
+    from model.shared import SharedBoard, SharedBoardView
+    from model.relocation import VacancyMap
+    from model.parallel import ParallelScanner
 
 
 def neighbourhood(
@@ -86,6 +92,18 @@ def neighbourhood(
                 yield cast(Coordinate, tuple(ret))
 
 
+def cell_typecode(number_of_species: int) -> str:
+    """
+    Returns the narrowest signed `array` typecode that can hold every species on a board with `number_of_species` species as well as the `-1` used to mark empty cells
+    """
+    if number_of_species <= 127:
+        return "b"
+    elif number_of_species <= 32767:
+        return "h"
+    else:
+        return "i"
+
+
 class Board2D(Board):
     def __init__(self, width: int, height: int, neighbourhood_size: int = 1, **kwargs):
 
@@ -96,6 +114,14 @@ class Board2D(Board):
         else:
             self._NEIGHBOURHOOD_SIZE: Final[int] = neighbourhood_size
 
+        # Every cell's neighbourhood is the same ring of cells shifted over, so we only need to store the ring once. Away from the edges of the board, the flat index of each neighbour is just a fixed offset from the cell's own
+        self._RING: Final[List[Coordinate]] = list(
+            neighbourhood(pseudoradius=neighbourhood_size)
+        )
+        self._RING_OFFSETS: Final[array[int]] = array(
+            "i", (dx + dy * width for (dx, dy) in self._RING)
+        )
+
         try:
             self._PROXIMITY_BIASES = (
                 kwargs["proximity_bias"],
@@ -110,15 +136,16 @@ class Board2D(Board):
                     0.75,
                 ) * self.get_number_of_species()  # Default value
 
-        # We then create a structure to store all of the data, intializing all
-        # squares to -1, which will be converted to `None` when using `__getitem__()`
-        self._data: array[int] = array(
-            "i",
-            [
-                -1,
-            ]
-            * self.get_area(),
-        )
+        # Agents can either look for new spots at random or go straight for the nearest spot where they know they'll be satisfied
+        try:
+            self._RELOCATION: Final[str] = kwargs["relocation"]
+            if self._RELOCATION not in ["random", "targeted"]:
+                raise ValueError('relocation must be either "random" or "targeted"')
+        except KeyError:
+            self._RELOCATION = "random"  # Default value
+
+        # We then create a structure to store all of the data
+        self._allocate_cells()
 
         # We will track which squares are vacant so that we can efficiently find
         # spots to place all of our agentsmoves: Iterator[Tuple[Point, Point]] = iter(())
@@ -130,6 +157,117 @@ class Board2D(Board):
             for _ in range(self.get_population(species)):
                 self[vacant_cells.pop(0)] = species
 
+        # Wide neighbourhoods are much quicker to count up using summed-area tables, if the user asked for them
+        try:
+            if not isinstance(kwargs["summed_area_tables"], bool):
+                raise TypeError("summed_area_tables must be a bool")
+            self._summed_area: SummedAreaTables | None = (
+                SummedAreaTables(self) if kwargs["summed_area_tables"] else None
+            )
+        except KeyError:
+            self._summed_area = None  # Default value
+
+        # The cells only get moved into shared memory if `share()` is called. The rounds are counted separately from the log for the header, since whoever is running the board may throw away old entries of the log
+        self._shared: "SharedBoard | None" = None
+        self._rounds_run: int = 0
+
+        # Targeted relocation needs to know where every species would be satisfied, which we can only work out now that everyone has been placed
+        self._vacancies: "VacancyMap | None" = None
+        if self._RELOCATION == "targeted":
+            # This is imported here since `model.relocation` itself needs `neighbourhood()` from this module
+            from model.relocation import VacancyMap
+
+            self._vacancies = VacancyMap(self)
+
+        # The read-only parts of each round can be split across a pool of worker processes, which requires the cells to be in shared memory so the workers can see them (until `unshare()` is called)
+        self._scanner: "ParallelScanner | None" = None
+        try:
+            if kwargs["workers"] is not None:
+                from model.parallel import ParallelScanner
+
+                # This is checked before sharing the board, since nothing would be left to remove the shared block if the board failed to be made
+                if kwargs["workers"] <= 0:
+                    raise ValueError("workers must be strictly positive")
+                self.share()
+                try:
+                    self._scanner = ParallelScanner(self, kwargs["workers"])
+                except BaseException:
+                    self.unshare()
+                    raise
+        except KeyError:
+            pass
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        A pickled board is a copy of its own, so a board that has been shared takes a copy of its cells out of shared memory, and leaves behind its shared memory block and workers (which belong to the original)
+        """
+        state: Dict[str, Any] = dict(self.__dict__)
+        if self._shared is not None:
+            state["_data"] = array(self._shared.cells.format, self._shared.cells)
+        state["_shared"] = None
+        state["_scanner"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        if isinstance(self._data, str):
+            # Only the workers of a `ParallelScanner` are handed a board whose cells are the name of a shared memory block, so there's no need to import this any sooner
+            from model.shared import SharedBoardView
+
+            self._view: "SharedBoardView" = SharedBoardView(self._data)
+            self._data = cast(Any, self._view.get_cells())
+
+    def _worker_state(self) -> Dict[str, Any]:
+        """
+        Returns the state the workers of a `ParallelScanner` rebuild the board from. Rather than a copy of the cells, this holds the name of the shared memory block, so the workers read the very same cells as this board
+
+        The workers never see any of the moves, so anything this board keeps up to date as it moves its agents (its summed-area tables and vacancy map) would go stale and is left behind
+        """
+        state: Dict[str, Any] = self.__getstate__()
+        state["_data"] = cast("SharedBoard", self._shared).get_name()
+        state["_summed_area"] = None
+        state["_vacancies"] = None
+        return state
+
+    def _allocate_cells(self) -> None:
+        """
+        Creates the (empty) storage for the cells of the board. Each cell takes up as few bytes as the number of species allows, and all of them start out as -1, which will be converted to `None` when using `__getitem__()`
+        """
+        self._data: array[int] = array(
+            cell_typecode(self.get_number_of_species()),
+            [
+                -1,
+            ]
+            * self.get_area(),
+        )
+
+    def get_cell_buffer(self) -> "array[int]":
+        return self._data
+
+    def get_cell(self, i: int) -> int:
+        return self._data[i]
+
+    def set_cell_buffer(self, cells: Iterable[int]) -> None:
+        cells = list(cells)
+        if len(cells) != self.get_area():
+            raise ValueError("The number of cells doesn't match the size of the board")
+
+        # Anyone watching a shared board mustn't see it half replaced
+        if self._shared is not None:
+            self._shared.begin_write()
+        for (i, species) in enumerate(cells):
+            self[(i % self.get_width(), i // self.get_width())] = (
+                None if species < 0 else species
+            )
+        if self._shared is not None:
+            self._shared.end_write()
+
+        # Anything we were keeping track of about the old contents is now out of date
+        if self._summed_area is not None:
+            self._summed_area.rebuild()
+        if self._vacancies is not None:
+            self._vacancies = type(self._vacancies)(self)
+
     def __getitem__(self, xy: Coordinate) -> Species:
         if self.includes(xy):
             (x, y) = xy
@@ -171,69 +309,206 @@ class Board2D(Board):
         else:
             raise OutOfBoundsError
 
-    def update(self) -> None:
+    def neighbour_indices(self, i: int) -> List[int]:
+        WIDTH: Final[int] = self._WIDTH
+        HEIGHT: Final[int] = self._HEIGHT
+        r: Final[int] = self._NEIGHBOURHOOD_SIZE
+        (x, y) = (i % WIDTH, i // WIDTH)
+
+        if r <= x < WIDTH - r and r <= y < HEIGHT - r:
+            return [i + offset for offset in self._RING_OFFSETS]
+        else:
+            return [
+                (y + dy) * WIDTH + x + dx
+                for (dx, dy) in self._RING
+                if 0 <= x + dx < WIDTH and 0 <= y + dy < HEIGHT
+            ]
+
+    def neighbourhood_counts(self, xy: Coordinate) -> List[int]:
         """
-        Runs one full round of the simulation
+        Returns the number of neighbours of `xy` belonging to each species, read off from the summed-area tables (so this can only be used on boards which have them, see `get_summed_area_tables()`)
         """
+        return [
+            self._count_neighbourhood(xy, s)
+            for s in range(self.get_number_of_species())
+        ]
 
-        def move(start: Coordinate, end: Coordinate) -> None:
-            """
-            Moves the agent located at `start` to `end`
-            """
-            if self[start] == None:
-                raise EmptySpaceError(start)
-            elif self[end] != None:
-                raise IllegalMoveError(start, end)
-            else:
-                self[end] = self[start]
-                self[start] = None
+    def _count_neighbourhood(self, xy: Coordinate, species: int) -> int:
+        """
+        Returns the number of neighbours of `xy` belonging to `species`, read off from the summed-area tables
+        """
+        return cast(SummedAreaTables, self._summed_area).count_ring(
+            species, xy, self._NEIGHBOURHOOD_SIZE
+        )
 
-        def find_and_move_to_new_spot(xy: Coordinate) -> Coordinate:
-            """
-            Finds a suitable point for the agent at `xy` to move to and moves the agent to that location and produces that point as a return-value.
+    def conspecificity(self, xy: Coordinate) -> float:
+        if self._summed_area is None:
+            return super().conspecificity(xy)
 
-            Schelling allows for a variety of algorithms to achieve this. In this this particular case we use the following algorithm:
+        species: Species = self[xy]
+        if species is None:
+            raise EmptySpaceError(xy)
 
-            The agent first chooses a search space. This search space will include at least the spaces immediately surrounding the agent (including corners). The agent then has the option to expand their search space outwards by one unit. If they do choose to expand the search space, they are given the option to expand it again. This outward expansion may theoretically continue forever. At each iteratetion, the probability that the agent chooses to expand the search space is `1-proximity_bias`.
+        counts: List[int] = self.neighbourhood_counts(xy)
+        try:
+            return counts[species] / sum(counts)
+        except ZeroDivisionError:
+            return 0
 
-            Once the search space is chosen, the agent will randomly choose a point from it to try to move to. If the piece is unable to succesfully make the move (i.e. it would move the piece off the board or if another agent is already occupying the chosen space) the agent will discard their first choice and choose another. If their are no open spots in the agent's search space, it will stay put.
-            """
+    def share(self, name: str | None = None) -> str:
+        """
+        Moves the cells of the board into shared memory, along with a small header of stats which is updated every round, so that other processes can watch the board as it runs (see `SharedBoardView`). Returns the name of the shared memory block
+        """
+        if self._shared is None:
+            # Most boards are never shared, so this is only imported once one is
+            from model.shared import SharedBoard
+
+            self._shared = SharedBoard(
+                self._data,
+                self.get_width(),
+                self.get_height(),
+                self.get_number_of_species(),
+                name,
+            )
+            self._data = cast(Any, self._shared.cells)
+        return self._shared.get_name()
+
+    def unshare(self) -> None:
+        """
+        Moves the cells of the board back out of shared memory and removes the shared memory block
+        """
+        if self._shared is not None:
+            # The workers can't do anything without the shared cells, so they have to go too
+            if self._scanner is not None:
+                self._scanner.close()
+                self._scanner = None
+            self._data = self._shared.close()
+            self._shared = None
+
+    def get_shared(self) -> "SharedBoard | None":
+        return self._shared
+
+    def get_summed_area_tables(self) -> SummedAreaTables | None:
+        return self._summed_area
+
+    def get_vacancy_map(self) -> "VacancyMap | None":
+        return self._vacancies
+
+    def get_total_satisfied(self) -> int:
+        if self._scanner is None:
+            return super().get_total_satisfied()
+        return self._scanner.count_satisfied()
+
+    def mean_conspecificity(self) -> float:
+        if self._scanner is None:
+            return super().mean_conspecificity()
+
+        # The values are added up here in the same order as `Board.mean_conspecificity()` would, so the answer is exactly the same
+        total_conspecificity: float = 0
+        total_counted: int = 0
+        for c in self._scanner.conspecificities():
+            total_conspecificity += c
+            total_counted += 1
+        assert total_counted == self.get_total_population()
+        return total_conspecificity / total_counted
+
+    def move(self, start: Coordinate, end: Coordinate) -> None:
+        """
+        Moves the agent located at `start` to `end`
+        """
+        if self[start] == None:
+            raise EmptySpaceError(start)
+        elif self[end] != None:
+            raise IllegalMoveError(start, end)
+        else:
+            if self._shared is not None:
+                self._shared.begin_write()
+            self[end] = self[start]
+            self[start] = None
+            if self._shared is not None:
+                self._shared.end_write()
+            if self._summed_area is not None:
+                self._summed_area.note_move(start, end, cast(int, self[end]))
+            if self._vacancies is not None:
+                self._vacancies.note_move(start, end)
+
+    def find_and_move_to_new_spot(self, xy: Coordinate) -> Coordinate:
+        """
+        Finds a suitable point for the agent at `xy` to move to and moves the agent to that location and produces that point as a return-value.
 
-            species: Species = self[xy]
+        Schelling allows for a variety of algorithms to achieve this. In this this particular case we use the following algorithm:
 
-            if not isinstance(species, int):
-                raise EmptySpaceError(xy)
+        The agent first chooses a search space. This search space will include at least the spaces immediately surrounding the agent (including corners). The agent then has the option to expand their search space outwards by one unit. If they do choose to expand the search space, they are given the option to expand it again. This outward expansion may theoretically continue forever. At each iteratetion, the probability that the agent chooses to expand the search space is `1-proximity_bias`.
 
-            searchspace = list()
-            for r in itertools.count(start=1):
-                searchspace += list(neighbourhood(pseudoradius=r, centre=xy))
-                if random() < self._PROXIMITY_BIASES[species]:
-                    break
+        Once the search space is chosen, the agent will randomly choose a point from it to try to move to. If the piece is unable to succesfully make the move (i.e. it would move the piece off the board or if another agent is already occupying the chosen space) the agent will discard their first choice and choose another. If their are no open spots in the agent's search space, it will stay put.
 
-            shuffle(searchspace)
+        If the board was created with `relocation="targeted"` the agent skips all of that and moves straight to a nearby vacancy where it would be satisfied (see `VacancyMap.choose()`), or stays put if there isn't one.
+        """
 
-            while searchspace:
-                candidate_spot: Coordinate = searchspace.pop(0)
-                try:
-                    move(xy, candidate_spot)
-                    return candidate_spot
-                except (IllegalMoveError, EmptySpaceError, OutOfBoundsError):
-                    continue
-            return xy
+        species: Species = self[xy]
+
+        if not isinstance(species, int):
+            raise EmptySpaceError(xy)
+
+        if self._vacancies is not None:
+            destination: Coordinate | None = self._vacancies.choose(
+                xy, species, self._PROXIMITY_BIASES[species]
+            )
+            if destination is None:
+                return xy
+            else:
+                self.move(xy, destination)
+                return destination
+
+        searchspace = list()
+        for r in itertools.count(start=1):
+            searchspace += list(neighbourhood(pseudoradius=r, centre=xy))
+            if random() < self._PROXIMITY_BIASES[species]:
+                break
+
+        shuffle(searchspace)
+
+        while searchspace:
+            candidate_spot: Coordinate = searchspace.pop(0)
+            try:
+                self.move(xy, candidate_spot)
+                return candidate_spot
+            except (IllegalMoveError, EmptySpaceError, OutOfBoundsError):
+                continue
+        return xy
+
+    def update(self) -> None:
+        """
+        Runs one full round of the simulation
+        """
 
         dissatisfied_agents: List[Coordinate] = list()
         moves_this_round: List[Tuple[Coordinate, Coordinate]] = list()
 
-        for (i, j) in self.get_all_cells():
-            if not (self[(i, j)] == None or self.is_satisfied((i, j))):
-                dissatisfied_agents.append((i, j))
+        if self._scanner is not None:
+            dissatisfied_agents = self._scanner.find_dissatisfied()
+        else:
+            for (i, j) in self.get_all_cells():
+                if not (self[(i, j)] == None or self.is_satisfied((i, j))):
+                    dissatisfied_agents.append((i, j))
 
         shuffle(dissatisfied_agents)
 
+        if self._shared is not None:
+            self._shared.begin_write()
+
         for agent_location in dissatisfied_agents:
-            destination = find_and_move_to_new_spot(agent_location)
+            destination = self.find_and_move_to_new_spot(agent_location)
             if (agent_location != destination) and (self.log != None):
                 moves_this_round.append((agent_location, destination))
 
         if isinstance(self.log, list):
             self.log.append(moves_this_round)
+        self._rounds_run += 1
+
+        if self._shared is not None:
+            self._shared.end_write(
+                round=self._rounds_run,
+                moves=len(moves_this_round),
+                dissatisfied=len(dissatisfied_agents),
+            )
@@ -1,6 +1,7 @@
 # from helpers import count
-from typing import Tuple, Iterator, Dict, Any, Final, List, Callable, Iterable
+from typing import Tuple, Iterator, Dict, Any, Final, List, Callable, Iterable, cast
 from abc import abstractmethod
+from array import array
 import itertools
 
 Coordinate = Tuple[int, int]
@@ -35,6 +36,17 @@ class EveryoneIsSatisfiedException(Exception):
         self.message = "There is nothing to update. Everyone is satisfied"
 
 
+class EveryoneIsStuckException(Exception):
+    """
+    Occurs when every agent who is still dissatisfied has already failed to find anywhere to move to, and nothing has changed since that could give them somewhere
+    """
+
+    def __init__(self):
+        self.message = (
+            "There is nothing to update. No dissatisfied agent has anywhere to go"
+        )
+
+
 class OverdeterminationError(ValueError):
     """
     Occurs when too many parameters are used to initialize a board
@@ -238,6 +250,60 @@ class Board:
     def get_total_population(self) -> int:
         return sum(map(self.get_population, range(self.get_number_of_species())))
 
+    def get_threshold(self, species: int) -> float:
+        """
+        Returns the conspecificity an agent of the specified species needs to exceed in order to be satisfied
+        """
+        return self._THRESHOLDS[species]
+
+    def get_cell_buffer(self) -> "array[int]":
+        """
+        Returns the contents of the board as a flat buffer in row-major order (i.e. the cell `(x, y)` is found at index `y * width + x`), with `-1` standing in for empty cells
+
+        Boards which already store their cells this way may return their own storage rather than a copy, so the buffer should be treated as read-only
+        """
+        return array(
+            "i",
+            (
+                -1 if self[(x, y)] is None else cast(int, self[(x, y)])
+                for y in range(self.get_height())
+                for x in range(self.get_width())
+            ),
+        )
+
+    def get_cell(self, i: int) -> int:
+        """
+        Returns the species at flat index `i` (as used by `get_cell_buffer()`), or `-1` if the cell is empty. Unlike `get_cell_buffer()`, this never has to look at the rest of the board
+        """
+        species: Species = self[(i % self.get_width(), i // self.get_width())]
+        return -1 if species is None else species
+
+    @abstractmethod
+    def set_cell_buffer(self, cells: Iterable[int]) -> None:
+        """
+        Replaces the contents of the board with `cells`, given in the same format as `get_cell_buffer()`
+        """
+        pass
+
+    def neighbour_indices(self, i: int) -> Iterable[int]:
+        """
+        Yields the flat indices (as used by `get_cell_buffer()`) of all the neighbours of the cell at flat index `i`
+
+        These are worked out as they're asked for rather than stored, since a table of every cell's neighbours would take up far more memory than the board itself. Boards whose neighbourhoods have a simple shape can override this with something quicker
+        """
+        WIDTH: Final[int] = self.get_width()
+        return (
+            nx + ny * WIDTH for (nx, ny) in self.neighbours((i % WIDTH, i // WIDTH))
+        )
+
+    def inverse_neighbour_indices(self, i: int) -> Iterable[int]:
+        """
+        Yields the flat indices of all the cells which count the cell at flat index `i` as one of their neighbours
+
+        On most boards this is the same as `neighbour_indices()`, but boards where someone can be your neighbour without you being theirs have to override it
+        """
+        return self.neighbour_indices(i)
+
     @abstractmethod
     def neighbours(self, xy: Coordinate) -> Iterable[Coordinate]:
         """
@@ -0,0 +1,274 @@
+from array import array
+from collections import deque
+from typing import Deque, Dict, Final, Iterable, Iterator, List, Set, Tuple
+from model.base import *
+from model.area_model import Board2D
+
+# Following a move costs about as much as relabelling this many cells from scratch, so once a round has more moves than the board has cells divided by this, it's quicker to just start again
+MOVE_COST_IN_CELLS: Final[int] = 16
+
+
+class ClusterTracker:
+    """
+    Keeps track of the clusters of agents on a board, where a cluster is a group of agents of the same species connected through the four cells directly above, below, left and right of each other
+
+    The tracker keeps its own copy of the board and follows along with the moves recorded in `Board.log`, so once it's been created all that's needed is to call `sync()` after every round. The clusters themselves are held in a union-find structure, so an agent arriving somewhere just merges the clusters around it. Departures can split a cluster, which union-find can't undo, so in that case only the piece that was cut off gets worked out again. Rounds with so many moves that following them one by one would take longer than starting over are handled by working out every cluster from scratch
+    """
+
+    def __init__(self, board: Board):
+
+        # Agents on a `Board1D` shuffle everyone between their start and end points along with them, so a move can't be followed just by looking at its two ends
+        if not isinstance(board, Board2D):
+            raise TypeError(
+                "Clusters can only be tracked on boards where agents move one at a time"
+            )
+
+        self._board: Final[Board] = board
+        self._WIDTH: Final[int] = board.get_width()
+        self._HEIGHT: Final[int] = board.get_height()
+
+        # The rounds that have already happened are baked into the board's current state, so we only want to hear about ones after this
+        self._rounds_seen: int = len(board.log)
+
+        self._cells: array[int] = array("i", board.get_cell_buffer())
+
+        # The union-find forest is made of nodes rather than cells, so that a cell whose agent has left can be given a fresh node without breaking the paths of the cells which went through its old one. `_node` maps each occupied cell to its node and `_parent` is the forest itself. `_members` maps every root to the set of cells in its cluster, and `_size_counts` maps each species to how many of its clusters there are of each size
+        self._node: array[int] = array("i")
+        self._parent: array[int] = array("i")
+        self._members: Dict[int, Set[int]] = dict()
+        self._size_counts: List[Dict[int, int]] = list()
+        self._rebuild()
+
+    def _adjacent(self, i: int) -> Iterator[int]:
+        """
+        Yields the flat indices of the cells directly next to the cell at flat index `i`
+        """
+        x: int = i % self._WIDTH
+        if x > 0:
+            yield i - 1
+        if x + 1 < self._WIDTH:
+            yield i + 1
+        if i >= self._WIDTH:
+            yield i - self._WIDTH
+        if i + self._WIDTH < self._WIDTH * self._HEIGHT:
+            yield i + self._WIDTH
+
+    def _find(self, i: int) -> int:
+        """
+        Returns the root of the cluster containing the cell at flat index `i`, halving the path to it along the way
+        """
+        parent: array[int] = self._parent
+        n: int = self._node[i]
+        while parent[n] != n:
+            parent[n] = parent[parent[n]]
+            n = parent[n]
+        return n
+
+    def _count(self, species: int, size: int, change: int) -> None:
+        counts: Dict[int, int] = self._size_counts[species]
+        counts[size] = counts.get(size, 0) + change
+        if counts[size] == 0:
+            del counts[size]
+
+    def _add_cluster(self, species: int, members: Set[int]) -> None:
+        """
+        Registers `members` as a cluster in its own right, with a fresh root that all of them point straight to
+        """
+        root: int = len(self._parent)
+        self._parent.append(root)
+        for m in members:
+            self._node[m] = root
+        self._members[root] = members
+        self._count(species, len(members), +1)
+
+    def _rebuild(self) -> None:
+        """
+        Works out all of the clusters from scratch by flood filling the tracker's copy of the board
+        """
+        AREA: Final[int] = self._WIDTH * self._HEIGHT
+        self._node = array("i", [-1]) * AREA
+        self._parent = array("i")
+        self._members = dict()
+        self._size_counts = [dict() for _ in range(self._board.get_number_of_species())]
+
+        for i in range(AREA):
+            species: int = self._cells[i]
+            if species < 0 or self._node[i] >= 0:
+                continue
+            component: Set[int] = {i}
+            frontier: Deque[int] = deque(component)
+            while frontier:
+                for j in self._adjacent(frontier.popleft()):
+                    if self._cells[j] == species and j not in component:
+                        component.add(j)
+                        frontier.append(j)
+            self._add_cluster(species, component)
+
+    def _compact(self) -> None:
+        """
+        Throws away the nodes that no cell can reach any more, which build up as agents come and go
+        """
+        clusters: List[Set[int]] = list(self._members.values())
+        self._parent = array("i", range(len(clusters)))
+        self._members = dict()
+        for (root, members) in enumerate(clusters):
+            for m in members:
+                self._node[m] = root
+            self._members[root] = members
+
+    def _union(self, species: int, a: int, b: int) -> None:
+        root_a: int = self._find(a)
+        root_b: int = self._find(b)
+        if root_a == root_b:
+            return
+
+        # The smaller cluster always goes under the bigger one so the trees stay shallow and we copy as few members as possible
+        if len(self._members[root_a]) < len(self._members[root_b]):
+            (root_a, root_b) = (root_b, root_a)
+
+        self._count(species, len(self._members[root_a]), -1)
+        self._count(species, len(self._members[root_b]), -1)
+        self._parent[root_b] = root_a
+        self._members[root_a] |= self._members.pop(root_b)
+        self._count(species, len(self._members[root_a]), +1)
+
+    def _arrive(self, i: int, species: int) -> None:
+        """
+        Places an agent of `species` at flat index `i` and merges it with the clusters around it
+        """
+        self._cells[i] = species
+        self._add_cluster(species, {i})
+        for j in self._adjacent(i):
+            if self._cells[j] == species:
+                self._union(species, i, j)
+
+    def _cut_off(self, i: int, species: int) -> List[Set[int]]:
+        """
+        Returns the pieces of the cluster that have been cut off from the rest of it now that the agent at flat index `i` has left (which is usually none of them)
+
+        A search sets out from each of the agent's old neighbours in the cluster, with each taking a step in turn. Whenever two searches meet they are joined up, and a group of searches that runs out of cells before meeting all the others has found a piece that's been cut off. As soon as there's at most one group still going, everything it hasn't reached yet must belong to it, so we can stop there. That way we only ever look at about as many cells as there are in the smaller pieces, rather than the whole cluster
+        """
+        starts: List[int] = [j for j in self._adjacent(i) if self._cells[j] == species]
+        if len(starts) <= 1:
+            return list()
+
+        # `owner` maps every cell reached so far to the search that reached it, and `group` joins up the searches which have met
+        owner: Dict[int, int] = {start: k for (k, start) in enumerate(starts)}
+        frontiers: List[Deque[int]] = [deque([start]) for start in starts]
+        group: List[int] = list(range(len(starts)))
+
+        def top(k: int) -> int:
+            while group[k] != k:
+                k = group[k]
+            return k
+
+        while True:
+            groups: Set[int] = {top(k) for k in range(len(starts))}
+            if len(groups) == 1:
+                return list()
+            still_going: Set[int] = {
+                top(k) for k in range(len(starts)) if frontiers[k]
+            }
+            if len(still_going) <= 1:
+                break
+
+            for (k, frontier) in enumerate(frontiers):
+                if not frontier:
+                    continue
+                for j in self._adjacent(frontier.popleft()):
+                    if self._cells[j] != species:
+                        continue
+                    elif j not in owner:
+                        owner[j] = k
+                        frontier.append(j)
+                    elif top(owner[j]) != top(k):
+                        group[top(owner[j])] = top(k)
+
+        pieces: Dict[int, Set[int]] = {g: set() for g in groups - still_going}
+        for (j, k) in owner.items():
+            if top(k) in pieces:
+                pieces[top(k)].add(j)
+
+        # If every search ran out then they've all been explored in full, and the biggest piece can carry on as the old cluster
+        result: List[Set[int]] = sorted(pieces.values(), key=len)
+        return result if still_going else result[:-1]
+
+    def _depart(self, i: int) -> int:
+        """
+        Removes the agent at flat index `i`, splits up its old cluster if need be and returns its species
+        """
+        species: int = self._cells[i]
+        if species < 0:
+            raise EmptySpaceError((i % self._WIDTH, i // self._WIDTH))
+
+        root: int = self._find(i)
+        members: Set[int] = self._members[root]
+        self._count(species, len(members), -1)
+        members.discard(i)
+        self._cells[i] = -1
+        self._node[i] = -1
+
+        for piece in self._cut_off(i, species):
+            members -= piece
+            self._add_cluster(species, piece)
+
+        if members:
+            self._count(species, len(members), +1)
+        else:
+            del self._members[root]
+
+        return species
+
+    def record(self, moves: Iterable[Tuple[Coordinate, Coordinate]]) -> None:
+        """
+        Updates the clusters to account for one round's worth of moves, in the same format as an entry of `Board.log`
+        """
+        moves = list(moves)
+        if len(moves) * MOVE_COST_IN_CELLS > self._WIDTH * self._HEIGHT:
+            for ((x0, y0), (x1, y1)) in moves:
+                self._cells[y1 * self._WIDTH + x1] = self._cells[y0 * self._WIDTH + x0]
+                self._cells[y0 * self._WIDTH + x0] = -1
+            self._rebuild()
+            return
+
+        for ((x0, y0), (x1, y1)) in moves:
+            # Every move leaves a node or two behind, so every so often we clear them out
+            if len(self._parent) > 2 * self._WIDTH * self._HEIGHT:
+                self._compact()
+            species: int = self._depart(y0 * self._WIDTH + x0)
+            self._arrive(y1 * self._WIDTH + x1, species)
+
+    def sync(self) -> None:
+        """
+        Catches up on every round in the board's log since the last time this was called
+
+        This finds its place in the log by position, so if old entries of the log are being thrown away each round should be handed to `record()` instead
+        """
+        log = self._board.log
+        while self._rounds_seen < len(log):
+            self.record(log[self._rounds_seen])
+            self._rounds_seen += 1
+
+    def get_size_distribution(self, species: int | None = None) -> Dict[int, int]:
+        """
+        Returns a mapping from cluster size to the number of clusters of that size, either for one species or (if `species` is `None`) for everyone
+        """
+        if species is not None:
+            return dict(sorted(self._size_counts[species].items()))
+        distribution: Dict[int, int] = dict()
+        for counts in self._size_counts:
+            for (size, n) in counts.items():
+                distribution[size] = distribution.get(size, 0) + n
+        return dict(sorted(distribution.items()))
+
+    def get_number_of_clusters(self, species: int | None = None) -> int:
+        """
+        Returns the number of clusters, either for one species or (if `species` is `None`) for everyone
+        """
+        return sum(self.get_size_distribution(species).values())
+
+    def get_largest_cluster_size(self, species: int | None = None) -> int:
+        """
+        Returns the size of the biggest cluster, either for one species or (if `species` is `None`) for everyone
+        """
+        return max(self.get_size_distribution(species), default=0)
@@ -0,0 +1,319 @@
+from array import array
+from bisect import bisect_right
+from struct import Struct
+from typing import BinaryIO, Final, List, Tuple
+from model.base import *
+from model.area_model import Board2D, cell_typecode
+
+# A history file starts with a header, followed by a record for every round (and a keyframe every so often), and finishes with an index of where all the records are so that any round can be found without reading the whole file
+#
+#     header:   magic, version, width, height, keyframe interval, cell typecode, move kind
+#     record:   tag (b"K" for a keyframe or b"D" for a round's moves), round, number of items, items
+#     trailer:  offsets of every delta record, offsets of every keyframe record, then the number of each and where they start
+#
+# Keyframes hold every cell of the board in row-major order. Deltas hold each move as four unsigned integers `x0, y0, x1, y1`
+MAGIC: Final[bytes] = b"SCHH"
+TRAILER_MAGIC: Final[bytes] = b"SCHI"
+VERSION: Final[int] = 1
+
+HEADER: Final[Struct] = Struct("<4sHIII1sB")
+RECORD: Final[Struct] = Struct("<1sII")
+TRAILER: Final[Struct] = Struct("<QQQ4s")
+
+# Agents on a `Board2D` jump straight from one cell to another, whereas agents on a `Board1D` get inserted into the row, shuffling everyone in between along by one
+JUMPING_MOVES: Final[int] = 0
+SHIFTING_MOVES: Final[int] = 1
+
+Move = Tuple[Coordinate, Coordinate]
+
+
+class CorruptHistoryError(Exception):
+    """
+    Occurs when a history file can't be read
+    """
+
+    def __init__(self, path: str):
+        self.message = f"{path} is not a valid history file"
+
+
+def encode_header(board: Board, keyframe_interval: int) -> bytes:
+    """
+    Returns the header describing the records that will follow it for `board`
+    """
+    return HEADER.pack(
+        MAGIC,
+        VERSION,
+        board.get_width(),
+        board.get_height(),
+        keyframe_interval,
+        cell_typecode(board.get_number_of_species()).encode(),
+        JUMPING_MOVES if isinstance(board, Board2D) else SHIFTING_MOVES,
+    )
+
+
+def encode_keyframe(round: int, cells: "array[int]", typecode: str) -> bytes:
+    """
+    Returns the record for a keyframe of `cells` taken at `round`
+    """
+    return RECORD.pack(b"K", round, len(cells)) + array(typecode, cells).tobytes()
+
+
+def encode_delta(round: int, moves: List[Move]) -> bytes:
+    """
+    Returns the record for the moves made during `round`
+    """
+    return RECORD.pack(b"D", round, len(moves)) + array(
+        "I", (c for ((x0, y0), (x1, y1)) in moves for c in (x0, y0, x1, y1))
+    ).tobytes()
+
+
+def apply_moves(cells: "array[int]", width: int, moves: List[Move], kind: int) -> None:
+    """
+    Replays `moves` on the row-major buffer `cells`
+    """
+    for ((x0, y0), (x1, y1)) in moves:
+        if kind == SHIFTING_MOVES:
+            cells.insert(x1, cells.pop(x0))
+        else:
+            cells[y1 * width + x1] = cells[y0 * width + x0]
+            cells[y0 * width + x0] = -1
+
+
+class HistoryWriter:
+    """
+    Records the history of a board to a file as it runs
+
+    The state of the board is saved in full every `keyframe_interval` rounds, and in between only the moves from `Board.log` are saved, so memory use stays constant no matter how long the run goes on for. Call `sync()` after every round (or every few rounds) and `close()` once the run is over (or just use it in a `with` statement)
+
+`sync()` finds its place in the log by position, so it needs the log to be kept whole. Anything that throws away old entries of the log (so that it doesn't grow for the whole run) should hand each round to `record()` instead, straight after it has happened
+    """
+
+    def __init__(self, path: str, board: Board, keyframe_interval: int = 100):
+
+        if keyframe_interval <= 0:
+            raise ValueError("keyframe_interval must be strictly positive")
+
+        self._board: Final[Board] = board
+        self._KEYFRAME_INTERVAL: Final[int] = keyframe_interval
+        self._TYPECODE: Final[str] = cell_typecode(board.get_number_of_species())
+        self._file: BinaryIO = open(path, "wb")
+
+        self._file.write(encode_header(board, keyframe_interval))
+
+        # Only the offsets of the records are kept in memory, which is needed for the index at the end
+        self._delta_offsets: array[int] = array("Q")
+        self._keyframe_offsets: array[int] = array("Q")
+
+        self._round: int = 0
+        self._rounds_seen: int = len(board.log)
+        self._write_keyframe()
+
+    def _write_keyframe(self) -> None:
+        self._keyframe_offsets.append(self._file.tell())
+        self._file.write(
+            encode_keyframe(self._round, self._board.get_cell_buffer(), self._TYPECODE)
+        )
+
+    def _write_delta(self, moves: List[Tuple[Coordinate, Coordinate]]) -> None:
+        self._round += 1
+        self._delta_offsets.append(self._file.tell())
+        self._file.write(encode_delta(self._round, moves))
+
+    def _catch_up_keyframe(self) -> None:
+        # A keyframe has to show the board as it was at that round, which we can only see if we've caught up to the present
+        if len(self._keyframe_offsets) * self._KEYFRAME_INTERVAL <= self._round:
+            self._write_keyframe()
+
+    def record(self, moves: List[Tuple[Coordinate, Coordinate]]) -> None:
+        """
+        Writes out a single round, given its moves in the same format as an entry of `Board.log`. This has to be called as soon as the round has happened, since the board as it is now may be saved as the keyframe for that round
+        """
+        self._write_delta(moves)
+        self._catch_up_keyframe()
+
+    def sync(self) -> None:
+        """
+        Writes out every round in the board's log since the last time this was called
+        """
+        log = self._board.log
+        while self._rounds_seen < len(log):
+            self._write_delta(log[self._rounds_seen])
+            self._rounds_seen += 1
+        self._catch_up_keyframe()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        index_offset: int = self._file.tell()
+        self._file.write(self._delta_offsets.tobytes())
+        self._file.write(self._keyframe_offsets.tobytes())
+        self._file.write(
+            TRAILER.pack(
+                len(self._delta_offsets),
+                len(self._keyframe_offsets),
+                index_offset,
+                TRAILER_MAGIC,
+            )
+        )
+        self._file.close()
+
+    def __enter__(self) -> "HistoryWriter":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+class HistoryReader:
+    """
+    Reads back a file written by `HistoryWriter`, reconstructing the board at any round by replaying the moves since the nearest keyframe before it
+
+    If the file was never closed properly (e.g. the run crashed) the index is rebuilt by reading through the records instead
+    """
+
+    def __init__(self, path: str):
+
+        self._path: Final[str] = path
+        self._file: BinaryIO = open(path, "rb")
+
+        try:
+            (
+                magic,
+                version,
+                self._WIDTH,
+                self._HEIGHT,
+                self._KEYFRAME_INTERVAL,
+                typecode,
+                self._MOVE_KIND,
+            ) = HEADER.unpack(self._file.read(HEADER.size))
+        except Exception:
+            raise CorruptHistoryError(path)
+        if magic != MAGIC or version != VERSION:
+            raise CorruptHistoryError(path)
+        self._TYPECODE: Final[str] = typecode.decode()
+
+        self._delta_offsets: array[int] = array("Q")
+        self._keyframe_offsets: array[int] = array("Q")
+        self._keyframe_rounds: List[int] = list()
+        if not self._read_index():
+            self._scan()
+
+        # We keep hold of the last board we reconstructed, since scrubbing forward from it is cheaper than going back to a keyframe
+        self._cached: Tuple[int, array[int]] | None = None
+
+    def _read_index(self) -> bool:
+        self._file.seek(0, 2)
+        end: int = self._file.tell()
+        if end < HEADER.size + TRAILER.size:
+            return False
+        self._file.seek(end - TRAILER.size)
+        (deltas, keyframes, index_offset, magic) = TRAILER.unpack(
+            self._file.read(TRAILER.size)
+        )
+        if magic != TRAILER_MAGIC:
+            return False
+
+        self._file.seek(index_offset)
+        self._delta_offsets.frombytes(self._file.read(8 * deltas))
+        self._keyframe_offsets.frombytes(self._file.read(8 * keyframes))
+        for offset in self._keyframe_offsets:
+            self._keyframe_rounds.append(self._read_header_at(offset)[1])
+        return True
+
+    def _scan(self) -> None:
+        item_size: Final[int] = array(self._TYPECODE).itemsize
+        self._file.seek(0, 2)
+        end: Final[int] = self._file.tell()
+        offset: int = HEADER.size
+        while True:
+            self._file.seek(offset)
+            data: bytes = self._file.read(RECORD.size)
+            if len(data) < RECORD.size:
+                return
+            (tag, round, count) = RECORD.unpack(data)
+            if tag == b"K":
+                size: int = count * item_size
+            elif tag == b"D":
+                size = 16 * count
+            else:
+                return
+
+            # If the run crashed partway through writing a record, everything up to the last whole one can still be read
+            if offset + RECORD.size + size > end:
+                return
+            if tag == b"K":
+                self._keyframe_offsets.append(offset)
+                self._keyframe_rounds.append(round)
+            else:
+                self._delta_offsets.append(offset)
+            offset += RECORD.size + size
+
+    def _read_header_at(self, offset: int) -> Tuple[bytes, int, int]:
+        self._file.seek(offset)
+        return RECORD.unpack(self._file.read(RECORD.size))
+
+    def get_width(self) -> int:
+        return self._WIDTH
+
+    def get_height(self) -> int:
+        return self._HEIGHT
+
+    def get_number_of_rounds(self) -> int:
+        """
+        Returns the number of rounds recorded, not counting the starting state of the board (which is round 0)
+        """
+        return len(self._delta_offsets)
+
+    def get_moves(self, round: int) -> List[Move]:
+        """
+        Returns the moves made during `round`, in the same format as an entry of `Board.log`
+        """
+        if not (1 <= round <= self.get_number_of_rounds()):
+            raise OutOfBoundsError()
+        (_, _, count) = self._read_header_at(self._delta_offsets[round - 1])
+        numbers: array[int] = array("I")
+        numbers.frombytes(self._file.read(16 * count))
+        return [
+            ((numbers[k], numbers[k + 1]), (numbers[k + 2], numbers[k + 3]))
+            for k in range(0, len(numbers), 4)
+        ]
+
+    def get_cells(self, round: int) -> "array[int]":
+        """
+        Returns the board as it was at the end of `round` in the same format as `Board.get_cell_buffer()`
+        """
+        if not (0 <= round <= self.get_number_of_rounds()):
+            raise OutOfBoundsError()
+
+        k: int = bisect_right(self._keyframe_rounds, round) - 1
+        start: int = self._keyframe_rounds[k]
+
+        if self._cached is not None and start <= self._cached[0] <= round:
+            (start, cells) = (self._cached[0], array("i", self._cached[1]))
+        else:
+            (_, _, count) = self._read_header_at(self._keyframe_offsets[k])
+            stored: array[int] = array(self._TYPECODE)
+            stored.frombytes(self._file.read(count * stored.itemsize))
+            cells = array("i", stored)
+
+        for r in range(start + 1, round + 1):
+            apply_moves(cells, self._WIDTH, self.get_moves(r), self._MOVE_KIND)
+
+        self._cached = (round, array("i", cells))
+        return cells
+
+    def restore(self, board: Board, round: int) -> None:
+        """
+        Sets `board` to how it was at the end of `round`. The board's log is replaced with just the moves from that round so that `draw_board()` can draw them
+        """
+        board.set_cell_buffer(self.get_cells(round))
+        board.log = [self.get_moves(round)] if round > 0 else list()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "HistoryReader":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
@@ -62,6 +62,12 @@ class Board1D(Board):
 
             raise IndexError()
 
+    def set_cell_buffer(self, cells: Iterable[int]) -> None:
+        data: List[Species] = [None if species < 0 else species for species in cells]
+        if len(data) != self.get_width():
+            raise ValueError("The number of cells doesn't match the size of the board")
+        self._data = data
+
     def neighbours(self, xy: Coordinate) -> Iterable[Coordinate]:
         (x, y) = xy
         if 0 <= x < self.get_width() and y == 0:
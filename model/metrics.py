@@ -0,0 +1,232 @@
+from math import log
+from typing import (
+    Callable,
+    Dict,
+    Final,
+    Hashable,
+    List,
+    NamedTuple,
+    Tuple,
+    TYPE_CHECKING,
+    cast,
+)
+from model.base import *
+
+# Only used for type hints, so that scripts running a `Board1D` don't have to load the 2D boards just to measure it
+if TYPE_CHECKING:
+    from model.area_model import Board2D
+
+# The side length of the square tiles used by the dissimilarity and entropy indices when the board doesn't come with its own tiling
+DEFAULT_TILE_SIZE: Final[int] = 8
+
+Tiling = int | Callable[[Coordinate], Hashable]
+
+
+class Metrics(NamedTuple):
+    """
+    A collection of segregation measures for a board at one point in time
+
+    `mean_conspecificity`: The same value as `Board.mean_conspecificity()`
+
+    `conspecificity_by_species`: The mean conspecificity of the agents of each species
+
+    `satisfied_by_species`: The number of satisfied agents of each species
+
+    `dissimilarity_by_species`: Duncan's dissimilarity index of each species against everyone else, taken over the tiles of the board. With two species both entries are the same
+
+    `morans_i_by_species`: Moran's I of the indicator "this agent belongs to the species", taken over the occupied cells using the board's own notion of who neighbours whom
+
+    `like_joins`: The number of (ordered) neighbour pairs where both agents belong to the same species
+
+    `unlike_joins`: The number of (ordered) neighbour pairs where the agents belong to different species
+
+    `interface_length`: The number of cell edges which separate agents of different species
+
+    `entropy_index`: Theil's entropy index, taken over the tiles of the board
+    """
+
+    mean_conspecificity: float
+    conspecificity_by_species: Tuple[float, ...]
+    satisfied_by_species: Tuple[int, ...]
+    dissimilarity_by_species: Tuple[float, ...]
+    morans_i_by_species: Tuple[float, ...]
+    like_joins: int
+    unlike_joins: int
+    interface_length: int
+    entropy_index: float
+
+    def get_total_satisfied(self) -> int:
+        return sum(self.satisfied_by_species)
+
+
+def tile_indices(board: Board, tiling: Tiling | None = None) -> List[int]:
+    """
+    Returns, for each cell in row-major order, the number of the tile it belongs to
+
+    `tiling` can either be the side length of square tiles, or a function which takes a coordinate and returns some label for its tile. If it's left as `None` then boards that are divided into neighbourhoods (i.e. `BoardBN`) are tiled along their neighbourhoods, and everything else uses square tiles of side `DEFAULT_TILE_SIZE`
+    """
+    WIDTH: Final[int] = board.get_width()
+    HEIGHT: Final[int] = board.get_height()
+
+    if tiling is None:
+        try:
+            tiling = cast(Any, board).get_neighbourhood_size()
+        except AttributeError:
+            tiling = DEFAULT_TILE_SIZE
+
+    if isinstance(tiling, int):
+        if tiling <= 0:
+            raise ValueError("Tile size must be strictly positive")
+        tiles_across: int = -(-WIDTH // tiling)
+        return [
+            (y // tiling) * tiles_across + x // tiling
+            for y in range(HEIGHT)
+            for x in range(WIDTH)
+        ]
+    else:
+        # We turn whatever labels we were given into consecutive integers so they can be used to index lists
+        labels: Dict[Hashable, int] = dict()
+        return [
+            labels.setdefault(tiling((x, y)), len(labels))
+            for y in range(HEIGHT)
+            for x in range(WIDTH)
+        ]
+
+
+def measure(board: Board, tiling: Tiling | None = None) -> Metrics:
+    """
+    Computes all the measures in `Metrics` for `board` in a single pass over its cell buffer
+
+    See `tile_indices()` for how `tiling` is interpreted
+    """
+
+    WIDTH: Final[int] = board.get_width()
+    HEIGHT: Final[int] = board.get_height()
+    NUMBER_OF_SPECIES: Final[int] = board.get_number_of_species()
+    THRESHOLDS: Final[Tuple[float, ...]] = tuple(
+        map(board.get_threshold, range(NUMBER_OF_SPECIES))
+    )
+
+    cells = board.get_cell_buffer()
+    tiles: List[int] = tile_indices(board, tiling)
+
+    # Boards with summed-area tables can count up each neighbourhood without looking at every cell in it. We look for the method rather than checking for a `Board2D` so that `model.area_model` doesn't need importing
+    get_tables = getattr(board, "get_summed_area_tables", None)
+    counted: Final["Board2D | None"] = (
+        cast("Board2D", board)
+        if get_tables is not None and get_tables() is not None
+        else None
+    )
+
+    # These are all the running totals we will fill in as we go over the board
+    population: List[int] = [0] * NUMBER_OF_SPECIES
+    conspecificity: List[float] = [0.0] * NUMBER_OF_SPECIES
+    satisfied: List[int] = [0] * NUMBER_OF_SPECIES
+    joins_from: List[int] = [0] * NUMBER_OF_SPECIES  # pairs (s, anyone)
+    joins_into: List[int] = [0] * NUMBER_OF_SPECIES  # pairs (anyone, s)
+    joins_within: List[int] = [0] * NUMBER_OF_SPECIES  # pairs (s, s)
+    tile_populations: Dict[int, List[int]] = dict()
+    interface_length: int = 0
+
+    for i in range(WIDTH * HEIGHT):
+        species: int = cells[i]
+        if species < 0:
+            continue
+
+        population[species] += 1
+        try:
+            tile_populations[tiles[i]][species] += 1
+        except KeyError:
+            tile_populations[tiles[i]] = [0] * NUMBER_OF_SPECIES
+            tile_populations[tiles[i]][species] += 1
+
+        # We look at the neighbours the same way `Board.conspecificity()` does, just without going through `__getitem__()` every time
+        neighbours: int = 0
+        conspecific_neighbours: int = 0
+        if counted is not None:
+            counts: List[int] = counted.neighbourhood_counts((i % WIDTH, i // WIDTH))
+            for (other, n) in enumerate(counts):
+                joins_into[other] += n
+            neighbours = sum(counts)
+            conspecific_neighbours = counts[species]
+        else:
+            for j in board.neighbour_indices(i):
+                other: int = cells[j]
+                if other >= 0:
+                    neighbours += 1
+                    joins_into[other] += 1
+                    if other == species:
+                        conspecific_neighbours += 1
+
+        c: float = conspecific_neighbours / neighbours if neighbours > 0 else 0
+        conspecificity[species] += c
+        if c > THRESHOLDS[species]:
+            satisfied[species] += 1
+        joins_from[species] += neighbours
+        joins_within[species] += conspecific_neighbours
+
+        # Each edge is only looked at from the cell to its left or above it so it doesn't get counted twice
+        x: int = i % WIDTH
+        if x + 1 < WIDTH and 0 <= cells[i + 1] != species:
+            interface_length += 1
+        if i + WIDTH < WIDTH * HEIGHT and 0 <= cells[i + WIDTH] != species:
+            interface_length += 1
+
+    TOTAL_POPULATION: Final[int] = sum(population)
+    TOTAL_JOINS: Final[int] = sum(joins_from)
+
+    def safe_divide(a: float, b: float) -> float:
+        return a / b if b != 0 else 0.0
+
+    # Duncan's dissimilarity index, treating each species in turn as the minority against everyone else
+    def dissimilarity(species: int) -> float:
+        others: int = TOTAL_POPULATION - population[species]
+        if population[species] == 0 or others == 0:
+            return 0.0
+        return 0.5 * sum(
+            abs(
+                counts[species] / population[species]
+                - (sum(counts) - counts[species]) / others
+            )
+            for counts in tile_populations.values()
+        )
+
+    # Moran's I of the species indicator, worked out from the join counts. For an indicator with mean `p` the numerator expands to `J(s,s) - p * (J(s,*) + J(*,s)) + p^2 * J(*,*)` and the denominator to `N * p * (1 - p)`
+    def morans_i(species: int) -> float:
+        p: float = safe_divide(population[species], TOTAL_POPULATION)
+        numerator: float = (
+            joins_within[species]
+            - p * (joins_from[species] + joins_into[species])
+            + p * p * TOTAL_JOINS
+        )
+        return safe_divide(
+            TOTAL_POPULATION * numerator,
+            TOTAL_JOINS * TOTAL_POPULATION * p * (1 - p),
+        )
+
+    def entropy(counts: List[int]) -> float:
+        total: int = sum(counts)
+        return -sum(n / total * log(n / total) for n in counts if n > 0)
+
+    TOTAL_ENTROPY: Final[float] = entropy(population)
+
+    return Metrics(
+        mean_conspecificity=safe_divide(sum(conspecificity), TOTAL_POPULATION),
+        conspecificity_by_species=tuple(
+            safe_divide(conspecificity[s], population[s])
+            for s in range(NUMBER_OF_SPECIES)
+        ),
+        satisfied_by_species=tuple(satisfied),
+        dissimilarity_by_species=tuple(map(dissimilarity, range(NUMBER_OF_SPECIES))),
+        morans_i_by_species=tuple(map(morans_i, range(NUMBER_OF_SPECIES))),
+        like_joins=sum(joins_within),
+        unlike_joins=TOTAL_JOINS - sum(joins_within),
+        interface_length=interface_length,
+        entropy_index=safe_divide(
+            sum(
+                sum(counts) * (TOTAL_ENTROPY - entropy(counts))
+                for counts in tile_populations.values()
+            ),
+            TOTAL_POPULATION * TOTAL_ENTROPY,
+        ),
+    )
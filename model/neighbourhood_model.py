@@ -2,6 +2,8 @@ import itertools
 from typing import Iterable
 from model.area_model import Board2D
 from model.base import Coordinate, Iterable
+from model.summed_area import SummedAreaTables
+from typing import Final, List, cast
 
 
 class BoardBN(Board2D):
@@ -29,3 +31,46 @@ class BoardBN(Board2D):
             range(corner_x, corner_x + self.get_neighbourhood_size()),
             range(corner_y, corner_y + self.get_neighbourhood_size()),
         )
+
+    def neighbour_indices(self, i: int) -> List[int]:
+        WIDTH: Final[int] = self.get_width()
+        SIZE: Final[int] = self.get_neighbourhood_size()
+
+        # This is the same block of cells as `neighbours()` goes over, in the same order
+        corner_x: int = int((i % WIDTH) / SIZE)
+        corner_y: int = int((i // WIDTH) / SIZE)
+        return [
+            y * WIDTH + x
+            for x in range(corner_x, corner_x + SIZE)
+            for y in range(corner_y, corner_y + SIZE)
+        ]
+
+    def inverse_neighbour_indices(self, i: int) -> List[int]:
+        WIDTH: Final[int] = self.get_width()
+        SIZE: Final[int] = self.get_neighbourhood_size()
+        (a, b) = (i % WIDTH, i // WIDTH)
+
+        # The block for `(x, y)` starts at `x // SIZE`, so it reaches `a` whenever `a - SIZE < x // SIZE <= a` (and the same goes for `y` and `b`)
+        return [
+            y * WIDTH + x
+            for y in range(
+                max(b - SIZE + 1, 0) * SIZE, min((b + 1) * SIZE, self.get_height())
+            )
+            for x in range(max(a - SIZE + 1, 0) * SIZE, min((a + 1) * SIZE, WIDTH))
+        ]
+
+    def _count_neighbourhood(self, xy: Coordinate, species: int) -> int:
+
+        (x, y) = xy
+
+        # This is the same block of cells as `neighbours()` goes over
+        corner_x: int = int(x / self.get_neighbourhood_size())
+        corner_y: int = int(y / self.get_neighbourhood_size())
+
+        return cast(SummedAreaTables, self._summed_area).count(
+            species,
+            corner_x,
+            corner_y,
+            corner_x + self.get_neighbourhood_size() - 1,
+            corner_y + self.get_neighbourhood_size() - 1,
+        )
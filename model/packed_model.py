@@ -0,0 +1,111 @@
+from array import array
+from typing import Final, List, Tuple
+from model.base import *
+from model.area_model import Board2D
+
+
+class PackedBoard2D(Board2D):
+    """
+    A `Board2D` for exactly two species which packs every cell into two bits
+
+    Each row of the board is stored as a single integer, with the cell at `x` taking up bits `2x` and `2x + 1`. A cell holds `0b00` when it's empty, `0b01` for species 0 and `0b10` for species 1, so the number of agents of each species in any stretch of a row can be counted by shifting out that stretch and counting its even or odd bits
+    """
+
+    def __init__(self, width: int, height: int, neighbourhood_size: int = 1, **kwargs):
+
+        # Neighbourhoods are counted straight from the packed rows, so summed-area tables would only ever be built and never read
+        if kwargs.get("summed_area_tables", False):
+            raise ValueError("Packed boards can't use summed-area tables")
+
+        super().__init__(width, height, neighbourhood_size, **kwargs)
+
+    def _allocate_cells(self) -> None:
+        if self.get_number_of_species() != 2:
+            raise ValueError("Packed boards can only hold two species")
+
+        self._rows: List[int] = [0] * self.get_height()
+
+        # These pick out the low (species 0) and high (species 1) bit of every cell in a row
+        self._EVEN_BITS: Final[int] = int("01" * self.get_width(), 2)
+        self._ODD_BITS: Final[int] = self._EVEN_BITS << 1
+
+    def share(self, name: str | None = None) -> str:
+        raise TypeError("Packed boards can't be shared")
+
+    def get_cell_buffer(self) -> "array[int]":
+        return array(
+            "b",
+            (
+                ((row >> (2 * x)) & 0b11) - 1
+                for row in self._rows
+                for x in range(self.get_width())
+            ),
+        )
+
+    def get_cell(self, i: int) -> int:
+        (y, x) = divmod(i, self.get_width())
+        return ((self._rows[y] >> (2 * x)) & 0b11) - 1
+
+    def __getitem__(self, xy: Coordinate) -> Species:
+        if self.includes(xy):
+            (x, y) = xy
+            code: int = (self._rows[y] >> (2 * x)) & 0b11
+            return code - 1 if code else None
+        else:
+            raise OutOfBoundsError()
+
+    def __setitem__(self, xy: Coordinate, newvalue: Species) -> None:
+
+        (x, y) = xy
+
+        if not self.includes(xy):
+            raise OutOfBoundsError()
+        elif not isinstance(newvalue, int):
+            code: int = 0
+        elif 0 <= newvalue < 2:
+            code = newvalue + 1
+        else:
+            raise ValueError("newvalue must be a valid species (i.e. 0 or 1)")
+
+        self._rows[y] = (self._rows[y] & ~(0b11 << (2 * x))) | (code << (2 * x))
+
+    def _count_in_row(self, y: int, x0: int, x1: int) -> Tuple[int, int]:
+        """
+        Returns the number of agents of species 0 and of species 1 in row `y` between `x0` and `x1` inclusive, ignoring any part of that range that falls off the board
+        """
+        x0 = max(x0, 0)
+        x1 = min(x1, self.get_width() - 1)
+        if not (0 <= y < self.get_height()) or x0 > x1:
+            return (0, 0)
+        stretch: int = (self._rows[y] >> (2 * x0)) & ((1 << (2 * (x1 - x0 + 1))) - 1)
+        return (
+            (stretch & self._EVEN_BITS).bit_count(),
+            (stretch & self._ODD_BITS).bit_count(),
+        )
+
+    def conspecificity(self, xy: Coordinate) -> float:
+        species: Species = self[xy]
+        if species is None:
+            raise EmptySpaceError(xy)
+
+        # The neighbourhood is the ring of cells `r` away from `xy`. Its top and bottom walls are whole stretches of a row, whereas its left and right walls only take one cell from each of the rows in between
+        (x, y) = xy
+        r: Final[int] = self._NEIGHBOURHOOD_SIZE
+        stretches: List[Tuple[int, int, int]] = [
+            (y - r, x - r, x + r),
+            (y + r, x - r, x + r),
+        ]
+        for row in range(y - r + 1, y + r):
+            stretches.append((row, x - r, x - r))
+            stretches.append((row, x + r, x + r))
+
+        counts: List[int] = [0, 0]
+        for stretch in stretches:
+            (zeros, ones) = self._count_in_row(*stretch)
+            counts[0] += zeros
+            counts[1] += ones
+
+        try:
+            return counts[species] / (counts[0] + counts[1])
+        except ZeroDivisionError:
+            return 0
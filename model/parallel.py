@@ -0,0 +1,90 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Final, List
+from model.base import *
+from model.area_model import Board2D
+
+# The board each worker process reads from, which is attached to the same shared cells as the board that created the pool
+_worker_board: Board | None = None
+
+
+def _attach(board_type: type, state: Dict[str, Any]) -> None:
+    global _worker_board
+    _worker_board = board_type.__new__(board_type)
+    _worker_board.__setstate__(state)
+
+
+def _find_dissatisfied(band: range) -> List[Coordinate]:
+    board: Board = cast(Board, _worker_board)
+    return [
+        (x, y)
+        for x in band
+        for y in range(board.get_height())
+        if board[(x, y)] is not None and not board.is_satisfied((x, y))
+    ]
+
+
+def _conspecificities(band: range) -> List[float]:
+    board: Board = cast(Board, _worker_board)
+    return [
+        board.conspecificity((x, y))
+        for x in band
+        for y in range(board.get_height())
+        if board[(x, y)] is not None
+    ]
+
+
+class ParallelScanner:
+    """
+    Splits the read-only scans over a board (finding who is dissatisfied, and working out everyone's conspecificity) across a pool of worker processes
+
+    The board has to be shared (see `Board2D.share()`) so that the workers read the same cells as the board itself rather than being sent a copy each time. Each worker gets the board (see `Board2D._worker_state()`) once when it starts up, and after that is only ever sent which cells to look at
+
+    Call `Board2D.unshare()` once the board is finished with, which also shuts the workers down
+
+    The board is split up into bands of columns, since `Board.get_all_cells()` goes through the board column by column. That way, putting the results of all the bands back together in order gives exactly the same list as going through the board in one go
+    """
+
+    def __init__(self, board: Board2D, workers: int):
+
+        if workers <= 0:
+            raise ValueError("workers must be strictly positive")
+
+        self._TOTAL_POPULATION: Final[int] = board.get_total_population()
+        self._pool: Final[ProcessPoolExecutor] = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_attach,
+            initargs=(type(board), board._worker_state()),
+        )
+
+        # A few bands per worker means no worker ends up waiting around for a slower one to finish
+        BANDS: Final[int] = min(board.get_width(), 4 * workers)
+        edges: List[int] = [board.get_width() * b // BANDS for b in range(BANDS + 1)]
+        self._bands: Final[List[range]] = [
+            range(edges[b], edges[b + 1]) for b in range(BANDS)
+        ]
+
+    def find_dissatisfied(self) -> List[Coordinate]:
+        """
+        Returns the location of every dissatisfied agent, in the same order as `Board.get_all_cells()`
+        """
+        return [
+            xy
+            for band in self._pool.map(_find_dissatisfied, self._bands)
+            for xy in band
+        ]
+
+    def conspecificities(self) -> List[float]:
+        """
+        Returns the conspecificity of every agent, in the same order as `Board.get_all_cells()`
+        """
+        return [
+            c for band in self._pool.map(_conspecificities, self._bands) for c in band
+        ]
+
+    def count_satisfied(self) -> int:
+        return self._TOTAL_POPULATION - sum(
+            map(len, self._pool.map(_find_dissatisfied, self._bands))
+        )
+
+    def close(self) -> None:
+        self._pool.shutdown()
@@ -0,0 +1,142 @@
+import json
+import mmap
+import os
+import sys
+from array import array
+from math import hypot
+from typing import BinaryIO, Dict, Final, List, Tuple
+from model.base import *
+from model.metrics import Metrics, measure
+
+SCHEMA_FILE: Final[str] = "schema.json"
+
+
+def columns(number_of_species: int) -> List[Tuple[str, str]]:
+    """
+    Returns the name and `array` typecode of every column recorded for a board with `number_of_species` species
+    """
+    return (
+        [("round", "Q"), ("moves", "I")]
+        + [(f"satisfied_{s}", "I") for s in range(number_of_species)]
+        + [("mean_conspecificity", "d"), ("mean_move_distance", "d")]
+    )
+
+
+class MetricsRecorder:
+    """
+    Records the stats of every round of a run to disk, with one file per column holding a fixed-width value per round
+
+    Rounds are gathered up in memory and written out `buffer_rounds` at a time, so the recorder itself never holds more than that many rounds however long the run is. Each round's moves are handed straight to `record()` rather than read from `Board.log`, so the board doesn't have to hang on to its log for the recorder's sake either. The files can be read back with `load_metrics()` without any parsing
+    """
+
+    def __init__(self, directory: str, board: Board, buffer_rounds: int = 4096):
+
+        if buffer_rounds <= 0:
+            raise ValueError("buffer_rounds must be strictly positive")
+
+        self._board: Final[Board] = board
+        self._round: int = 0
+        self._BUFFER_ROUNDS: Final[int] = buffer_rounds
+        self._COLUMNS: Final[List[Tuple[str, str]]] = columns(
+            board.get_number_of_species()
+        )
+
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, SCHEMA_FILE), "w") as schema:
+            json.dump(
+                {
+                    "byteorder": sys.byteorder,
+                    "columns": [
+                        {"name": name, "typecode": typecode}
+                        for (name, typecode) in self._COLUMNS
+                    ],
+                },
+                schema,
+            )
+
+        self._files: List[BinaryIO] = [
+            open(os.path.join(directory, f"{name}.bin"), "wb")
+            for (name, _) in self._COLUMNS
+        ]
+        self._buffers: List[array] = [
+            array(typecode) for (_, typecode) in self._COLUMNS
+        ]
+
+    def record(
+        self,
+        moves: List[Tuple[Coordinate, Coordinate]] | None = None,
+        metrics: Metrics | None = None,
+    ) -> None:
+        """
+        Records the board as it is now, along with `moves`, the moves made in the round that has just finished (in the same format as an entry of `Board.log`). The first call should leave out `moves` to record the board as it started out, and every call after that is counted as a new round
+
+        If the metrics for the board have already been worked out they can be passed in so they don't need to be worked out again
+        """
+        if metrics is None:
+            metrics = measure(self._board)
+        if moves is None:
+            moves = list()
+
+        distance: float = sum(hypot(x1 - x0, y1 - y0) for ((x0, y0), (x1, y1)) in moves)
+
+        values: List[float] = (
+            [self._round, len(moves)]
+            + list(metrics.satisfied_by_species)
+            + [metrics.mean_conspecificity, distance / len(moves) if moves else 0.0]
+        )
+        for (buffer, value) in zip(self._buffers, values):
+            buffer.append(value)
+
+        self._round += 1
+        if len(self._buffers[0]) >= self._BUFFER_ROUNDS:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes out every round recorded so far
+        """
+        for (file, buffer) in zip(self._files, self._buffers):
+            buffer.tofile(file)
+            file.flush()
+            del buffer[:]
+
+    def close(self) -> None:
+        self.flush()
+        for file in self._files:
+            file.close()
+
+    def __enter__(self) -> "MetricsRecorder":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+def load_metrics(directory: str) -> Dict[str, memoryview]:
+    """
+    Maps the columns written by a `MetricsRecorder` into memory, returning each one as a read-only view of its values that can be indexed and sliced like a list
+
+    Only the parts of the files that actually get looked at are read from disk
+    """
+    with open(os.path.join(directory, SCHEMA_FILE)) as schema_file:
+        schema = json.load(schema_file)
+
+    if schema["byteorder"] != sys.byteorder:
+        raise ValueError(
+            "The metrics were recorded on a machine with a different byte order"
+        )
+
+    loaded: Dict[str, memoryview] = dict()
+    for column in schema["columns"]:
+        with open(os.path.join(directory, f"{column['name']}.bin"), "rb") as file:
+            size: int = os.fstat(file.fileno()).st_size
+            itemsize: int = array(column["typecode"]).itemsize
+
+            # A column that was being written to when we opened it might end partway through a value, so we leave off anything after the last whole one
+            length: int = size - size % itemsize
+            if length == 0:
+                loaded[column["name"]] = memoryview(b"").cast(column["typecode"])
+                continue
+            mapped = mmap.mmap(file.fileno(), length, access=mmap.ACCESS_READ)
+            loaded[column["name"]] = memoryview(mapped).cast(column["typecode"])
+    return loaded
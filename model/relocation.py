@@ -0,0 +1,143 @@
+from random import choices
+from typing import Final, List, Set, Tuple
+from model.base import *
+from model.area_model import neighbourhood
+
+# Vacancies whose weight (relative to the nearest one) would fall below this are too unlikely to be worth searching for
+NEGLIGIBLE_WEIGHT: Final[float] = 0.01
+
+
+class VacancyMap:
+    """
+    Keeps track, for every species, of the vacant cells on a board where an agent of that species would be satisfied
+
+    The map reads the cells straight from the board one at a time (see `Board.get_cell()`), and is kept up to date through `note_move()` once the board has made each move. Whenever an agent moves, only the vacancies that neighbour either end of the move can have changed, so those are the only ones that get looked at again
+    """
+
+    def __init__(self, board: Board):
+
+        self._WIDTH: Final[int] = board.get_width()
+        self._HEIGHT: Final[int] = board.get_height()
+        self._NUMBER_OF_SPECIES: Final[int] = board.get_number_of_species()
+        self._THRESHOLDS: Final[Tuple[float, ...]] = tuple(
+            map(board.get_threshold, range(self._NUMBER_OF_SPECIES))
+        )
+
+        self._board: Final[Board] = board
+
+        self._satisfying: List[Set[int]] = [
+            set() for _ in range(self._NUMBER_OF_SPECIES)
+        ]
+        self._additions: List[int] = [0] * self._NUMBER_OF_SPECIES
+        for i in range(self._WIDTH * self._HEIGHT):
+            self._evaluate(i)
+
+    def _would_satisfy(self, i: int, species: int, leaving: int = -1) -> bool:
+        """
+        Returns `True` iff an agent of `species` would be satisfied at the flat index `i`, supposing the agent at `leaving` (if any) had left
+        """
+        cell = self._board.get_cell
+        neighbours: int = 0
+        conspecific_neighbours: int = 0
+        for j in self._board.neighbour_indices(i):
+            other: int = species if j == i else cell(j)
+            if other >= 0 and j != leaving:
+                neighbours += 1
+                if other == species:
+                    conspecific_neighbours += 1
+        try:
+            return conspecific_neighbours / neighbours > self._THRESHOLDS[species]
+        except ZeroDivisionError:
+            return 0 > self._THRESHOLDS[species]
+
+    def _evaluate(self, i: int) -> None:
+        vacant: bool = self._board.get_cell(i) < 0
+        for species in range(self._NUMBER_OF_SPECIES):
+            if vacant and self._would_satisfy(i, species):
+                if i not in self._satisfying[species]:
+                    self._satisfying[species].add(i)
+                    self._additions[species] += 1
+            else:
+                self._satisfying[species].discard(i)
+
+    def count_additions(self, species: int) -> int:
+        """
+        Returns the number of times a vacancy has become somewhere that an agent of `species` would be satisfied, so that anyone waiting for somewhere to go can tell when it's worth looking again
+        """
+        return self._additions[species]
+
+    def note_move(self, start: Coordinate, end: Coordinate) -> None:
+        """
+        Updates the map to account for the agent at `start` having moved to `end`, which the board must already show
+        """
+        (x0, y0) = start
+        (x1, y1) = end
+        i0: int = y0 * self._WIDTH + x0
+        i1: int = y1 * self._WIDTH + x1
+
+        for i in {
+            i0,
+            i1,
+            *self._board.inverse_neighbour_indices(i0),
+            *self._board.inverse_neighbour_indices(i1),
+        }:
+            self._evaluate(i)
+
+    def choose(
+        self, xy: Coordinate, species: int, proximity_bias: float
+    ) -> Coordinate | None:
+        """
+        Picks a vacancy for the agent of `species` at `xy` to move to where it would be satisfied, or returns `None` if there isn't one
+
+        The nearest such vacancy (by the number of rings of cells around `xy` between them) is always the most likely choice. Each ring further out than that is `1 - proximity_bias` times as likely, the same way that each extra ring of the search space is in `Board2D.find_and_move_to_new_spot()`
+        """
+        (x, y) = xy
+        origin: int = y * self._WIDTH + x
+        satisfying: Set[int] = self._satisfying[species]
+        MAX_RADIUS: Final[int] = max(self._WIDTH, self._HEIGHT)
+
+        def furthest_worth_searching(nearest: int) -> int:
+            r: int = nearest
+            while r < MAX_RADIUS and (1 - proximity_bias) ** (
+                r + 1 - nearest
+            ) >= NEGLIGIBLE_WEIGHT:
+                r += 1
+            return r
+
+        # We search outwards ring by ring, unless there are so few vacancies left that it would be quicker to just look at all of them
+        candidates: List[Tuple[int, int]] = list()  # (distance, flat index)
+        furthest: int = MAX_RADIUS
+        for r in range(1, MAX_RADIUS + 1):
+            if r > furthest:
+                break
+            elif (2 * r + 1) ** 2 > len(satisfying):
+                # The order a set goes through its items in depends on how it got to be the way it is (e.g. it changes when the map is pickled), so we sort the vacancies to make sure the same random numbers always pick the same one
+                candidates = sorted(
+                    (max(abs(i % self._WIDTH - x), abs(i // self._WIDTH - y)), i)
+                    for i in satisfying
+                )
+                if candidates:
+                    furthest = furthest_worth_searching(min(candidates)[0])
+                candidates = [c for c in candidates if c[0] <= furthest]
+                break
+            for (cx, cy) in neighbourhood(xy, r):
+                if 0 <= cx < self._WIDTH and 0 <= cy < self._HEIGHT:
+                    i: int = cy * self._WIDTH + cx
+                    if i in satisfying:
+                        if not candidates:
+                            furthest = furthest_worth_searching(r)
+                        candidates.append((r, i))
+
+        # The map was worked out with the agent still in place, so before settling on a spot we make sure it still works once the agent has left
+        while candidates:
+            nearest: int = min(candidates)[0]
+            weights: List[float] = [
+                (1 - proximity_bias) ** (distance - nearest)
+                for (distance, _) in candidates
+            ]
+            pick: int = choices(range(len(candidates)), weights)[0]
+            (_, i) = candidates[pick]
+            if self._would_satisfy(i, species, leaving=origin):
+                return (i % self._WIDTH, i // self._WIDTH)
+            candidates.pop(pick)
+        return None
@@ -0,0 +1,131 @@
+from random import expovariate
+from typing import Final, List, Set, Tuple, TYPE_CHECKING
+from model.base import *
+from model.area_model import Board2D
+from helpers import IndexedSet
+
+if TYPE_CHECKING:
+    from model.shared import SharedBoard
+
+
+class AsyncScheduler:
+    """
+    Runs a board one move at a time rather than one round at a time
+
+    Where `Board2D.update()` gives every agent that was dissatisfied at the start of the round a turn (even if someone else's move has since made it happy), the scheduler keeps a set of the agents who are dissatisfied right now and moves a random one of them at each event. After each move only the agents whose neighbourhoods include either end of the move can have changed their minds, so they are the only ones that get checked again
+
+    An agent that tries to move and can't find anywhere to go is parked rather than being given turn after turn to no effect. It only gets another turn once a move changes its neighbourhood, or opens up somewhere new it might go. With targeted relocation that means a new vacancy where its species would be satisfied, and with random relocation (where any vacancy will do) any move at all
+
+    Each dissatisfied agent that isn't parked moves at a rate of one per unit of time, so the simulated time between events is exponentially distributed with a rate equal to the number of those agents
+    """
+
+    def __init__(self, board: Board2D):
+
+        self._board: Final[Board2D] = board
+        self._WIDTH: Final[int] = board.get_width()
+
+        self.time: float = 0.0
+        self.events: int = 0
+
+        self._dissatisfied: IndexedSet[int] = IndexedSet()
+        self._parked: List[Set[int]] = [
+            set() for _ in range(board.get_number_of_species())
+        ]
+        self._additions_seen: List[int] = [0] * board.get_number_of_species()
+        for i in range(board.get_area()):
+            self._recheck(i)
+        self._wake()
+
+    def _recheck(self, i: int) -> None:
+        for parked in self._parked:
+            parked.discard(i)
+        xy: Coordinate = (i % self._WIDTH, i // self._WIDTH)
+        if self._board[xy] is not None and not self._board.is_satisfied(xy):
+            self._dissatisfied.add(i)
+        else:
+            self._dissatisfied.discard(i)
+
+    def _wake(self) -> None:
+        """
+        Gives the parked agents of every species that might now have somewhere new to go another turn
+        """
+        vacancies = self._board.get_vacancy_map()
+        for (species, parked) in enumerate(self._parked):
+            if vacancies is not None:
+                additions: int = vacancies.count_additions(species)
+                if additions == self._additions_seen[species]:
+                    continue
+                self._additions_seen[species] = additions
+            for i in parked:
+                self._dissatisfied.add(i)
+            parked.clear()
+
+    def get_number_dissatisfied(self) -> int:
+        return len(self._dissatisfied) + sum(map(len, self._parked))
+
+    def get_number_parked(self) -> int:
+        return sum(map(len, self._parked))
+
+    def step(self) -> Tuple[Coordinate, Coordinate]:
+        """
+        Moves one randomly chosen dissatisfied agent and returns where it moved from and to (which are the same if it couldn't find anywhere to go, in which case it gets parked)
+        """
+        if not self._dissatisfied:
+            if self.get_number_parked() > 0:
+                raise EveryoneIsStuckException()
+            raise EveryoneIsSatisfiedException()
+
+        self.time += expovariate(len(self._dissatisfied))
+        self.events += 1
+
+        shared: "SharedBoard | None" = self._board.get_shared()
+        if shared is not None:
+            shared.begin_write()
+
+        start: int = self._dissatisfied.choice()
+        start_xy: Coordinate = (start % self._WIDTH, start // self._WIDTH)
+        species: int = cast(int, self._board[start_xy])
+        end_xy: Coordinate = self._board.find_and_move_to_new_spot(start_xy)
+        end: int = end_xy[1] * self._WIDTH + end_xy[0]
+
+        if start == end:
+            self._dissatisfied.discard(start)
+            self._parked[species].add(start)
+        else:
+            for i in {
+                start,
+                end,
+                *self._board.inverse_neighbour_indices(start),
+                *self._board.inverse_neighbour_indices(end),
+            }:
+                self._recheck(i)
+            self._wake()
+
+        if shared is not None:
+            shared.end_write(
+                round=self.events,
+                moves=int(start != end),
+                dissatisfied=self.get_number_dissatisfied(),
+            )
+
+        return (start_xy, end_xy)
+
+    def run(self, max_events: int | None = None) -> int:
+        """
+        Keeps moving dissatisfied agents until there are none left who could move (i.e. everyone is either satisfied or parked) or `max_events` events have happened, and returns the number of events
+
+        All the moves made are recorded together as a single entry in the board's log
+        """
+        moves: List[Tuple[Coordinate, Coordinate]] = list()
+        events: int = 0
+
+        while self._dissatisfied and (max_events is None or events < max_events):
+            (start, end) = self.step()
+            events += 1
+            if start != end:
+                moves.append((start, end))
+
+        if isinstance(self._board.log, list):
+            self._board.log.append(moves)
+
+        return events
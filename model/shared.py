@@ -0,0 +1,183 @@
+from array import array
+from multiprocessing import parent_process, resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from struct import Struct
+from time import sleep
+from typing import Final, NamedTuple, Set, Tuple
+from model.base import *
+
+# The shared block starts with this header, followed immediately by the cells of the board in row-major order
+#
+#     sequence, round, moves last round, dissatisfied at the start of last round, width, height, number of species, cell typecode, padding
+#
+# The sequence number works as a seqlock: the board makes it odd before it starts changing anything and even again once it's done, so a reader knows its copy is consistent if the sequence number was the same (and even) before and after it made it
+HEADER: Final[Struct] = Struct("<QQQQIII1s3x")
+
+# The names of the blocks created by this process, which we need to know about to avoid disowning them when one is also viewed from this process
+_created_here: Set[str] = set()
+
+# How long a reader waits before trying again when it catches the board halfway through a round
+RETRY_DELAY: Final[float] = 0.0001
+
+
+class SharedStats(NamedTuple):
+    """
+    The stats published alongside the cells of a shared board. When the board is run by an `AsyncScheduler`, `round` and `moves` count single events rather than whole rounds
+    """
+
+    round: int
+    moves: int
+    dissatisfied: int
+    width: int
+    height: int
+    number_of_species: int
+
+
+class SharedBoard:
+    """
+    The writing side of a board whose cells live in shared memory, created through `Board2D.share()`
+
+    The board keeps reading and writing its cells exactly as it always does, it's just that they are now stored in the shared block rather than in an array of its own. All this class adds on top is the header, which the board updates at the start and end of every round
+    """
+
+    def __init__(
+        self,
+        cells: "array[int]",
+        width: int,
+        height: int,
+        number_of_species: int,
+        name: str | None = None,
+    ):
+
+        self._memory: SharedMemory = SharedMemory(
+            name=name, create=True, size=HEADER.size + len(cells) * cells.itemsize
+        )
+        _created_here.add(self._memory.name)
+        self._sequence: int = 0
+        self._writes_in_progress: int = 0
+        self._stats: SharedStats = SharedStats(
+            round=0,
+            moves=0,
+            dissatisfied=0,
+            width=width,
+            height=height,
+            number_of_species=number_of_species,
+        )
+        self._TYPECODE: Final[str] = cells.typecode
+        self._write_header()
+
+        # The block may have been rounded up to a whole number of pages, so we only take as much of it as the cells need
+        self.cells: memoryview = self._memory.buf[
+            HEADER.size : HEADER.size + len(cells) * cells.itemsize
+        ].cast(cells.typecode)
+        self.cells[:] = memoryview(cells)
+
+    def get_name(self) -> str:
+        return self._memory.name
+
+    def _write_header(self) -> None:
+        HEADER.pack_into(
+            self._memory.buf,
+            0,
+            self._sequence,
+            self._stats.round,
+            self._stats.moves,
+            self._stats.dissatisfied,
+            self._stats.width,
+            self._stats.height,
+            self._stats.number_of_species,
+            self._TYPECODE.encode(),
+        )
+
+    def begin_write(self) -> None:
+        """
+        Marks the board as being in the middle of changing
+
+        Writes can be nested (e.g. a single move inside a whole round), in which case the board only counts as consistent again once the outermost one has ended
+        """
+        self._writes_in_progress += 1
+        if self._writes_in_progress == 1:
+            self._sequence += 1
+            self._write_header()
+
+    def end_write(
+        self,
+        round: int | None = None,
+        moves: int | None = None,
+        dissatisfied: int | None = None,
+    ) -> None:
+        """
+        Marks the board as consistent again, updating whichever of the stats are given (which are usually those of the round that just finished)
+        """
+        if self._writes_in_progress == 0:
+            raise RuntimeError("end_write() was called without begin_write()")
+        self._writes_in_progress -= 1
+
+        self._stats = self._stats._replace(
+            round=self._stats.round if round is None else round,
+            moves=self._stats.moves if moves is None else moves,
+            dissatisfied=(
+                self._stats.dissatisfied if dissatisfied is None else dissatisfied
+            ),
+        )
+        if self._writes_in_progress == 0:
+            self._sequence += 1
+        self._write_header()
+
+    def close(self) -> "array[int]":
+        """
+        Removes the shared block and returns a copy of the cells that were in it
+        """
+        cells: array[int] = array(self._TYPECODE, self.cells)
+        self.cells.release()
+        self._memory.close()
+        self._memory.unlink()
+        _created_here.discard(self._memory.name)
+        return cells
+
+
+class SharedBoardView:
+    """
+    The reading side of a shared board, which can be opened from any process on the same machine knowing only the name of the block
+    """
+
+    def __init__(self, name: str):
+        self._memory: SharedMemory = SharedMemory(name=name)
+
+        # The block belongs to the board's process, so we make sure ours doesn't try to clean it up when it exits. Child processes of the board's process share its resource tracker though, so they have to leave it alone
+        if self._memory.name not in _created_here and parent_process() is None:
+            resource_tracker.unregister(self._memory._name, "shared_memory")  # type: ignore
+
+        (*_, width, height, _, typecode) = HEADER.unpack_from(self._memory.buf, 0)
+        self._cells: memoryview = self._memory.buf[
+            HEADER.size : HEADER.size + width * height * array(typecode.decode()).itemsize
+        ].cast(typecode.decode())
+
+    def get_cells(self) -> memoryview:
+        """
+        Returns the cells of the board themselves rather than a copy of them. These can change at any moment while the board is running
+        """
+        return self._cells
+
+    def snapshot(self) -> Tuple[SharedStats, "array[int]"]:
+        """
+        Returns the stats and a copy of the cells from the same moment in time, waiting for the board to finish its current round if need be
+        """
+        while True:
+            (before, *stats, _) = HEADER.unpack_from(self._memory.buf, 0)
+            if before % 2 == 0:
+                cells: array[int] = array("i", self._cells)
+                (after, *_) = HEADER.unpack_from(self._memory.buf, 0)
+                if before == after:
+                    return (SharedStats(*stats), cells)
+            sleep(RETRY_DELAY)
+
+    def close(self) -> None:
+        self._cells.release()
+        self._memory.close()
+
+    def __enter__(self) -> "SharedBoardView":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
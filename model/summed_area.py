@@ -0,0 +1,105 @@
+from array import array
+from typing import Final, List, Tuple
+from model.base import *
+
+
+class SummedAreaTables:
+    """
+    Keeps one summed-area table (also known as an integral image) per species, so that the number of agents of a species inside any rectangle of the board can be read off from the four corners of that rectangle, however big it is
+
+    The entry at `(x, y)` of a table is the number of agents of its species with coordinates strictly less than `x` and `y`, so each table is one row and one column bigger than the board
+
+    Moves are noted with `note_move()` but not applied straight away. The next time a count is asked for, the tables either apply each pending move (each of which has to touch every entry below and to the right of it) or are rebuilt from scratch from the board, depending on which of the two works out cheaper
+    """
+
+    def __init__(self, board: Board):
+        self._board: Final[Board] = board
+        self._WIDTH: Final[int] = board.get_width()
+        self._HEIGHT: Final[int] = board.get_height()
+        self._tables: List[array[int]] = list()
+        self._pending: List[Tuple[int, int, int, int]] = list()  # (x, y, species, change)
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """
+        Works out all of the tables from scratch using the board as it is now
+        """
+        WIDTH: Final[int] = self._WIDTH
+        HEIGHT: Final[int] = self._HEIGHT
+        cells = self._board.get_cell_buffer()
+
+        self._tables = list()
+        for species in range(self._board.get_number_of_species()):
+            table: array[int] = array("q", [0]) * ((WIDTH + 1) * (HEIGHT + 1))
+            for y in range(HEIGHT):
+                row_total: int = 0
+                for x in range(WIDTH):
+                    if cells[y * WIDTH + x] == species:
+                        row_total += 1
+                    table[(y + 1) * (WIDTH + 1) + x + 1] = (
+                        table[y * (WIDTH + 1) + x + 1] + row_total
+                    )
+            self._tables.append(table)
+
+        self._pending = list()
+
+    def note_move(self, start: Coordinate, end: Coordinate, species: int) -> None:
+        """
+        Lets the tables know that an agent of `species` has moved from `start` to `end`
+        """
+        self._pending.append((*start, species, -1))
+        self._pending.append((*end, species, +1))
+
+    def _sync(self) -> None:
+        if not self._pending:
+            return
+
+        # A rebuild touches every entry of every table once, whereas each pending change only touches the entries below and to the right of it
+        incremental_cost: int = sum(
+            (self._WIDTH - x) * (self._HEIGHT - y) for (x, y, _, _) in self._pending
+        )
+        rebuild_cost: int = len(self._tables) * self._WIDTH * self._HEIGHT
+
+        if incremental_cost >= rebuild_cost:
+            self.rebuild()
+            return
+
+        for (x, y, species, change) in self._pending:
+            table: array[int] = self._tables[species]
+            for row in range(y + 1, self._HEIGHT + 1):
+                offset: int = row * (self._WIDTH + 1)
+                for column in range(x + 1, self._WIDTH + 1):
+                    table[offset + column] += change
+        self._pending = list()
+
+    def count(self, species: int, x0: int, y0: int, x1: int, y1: int) -> int:
+        """
+        Returns the number of agents of `species` in the rectangle running from `(x0, y0)` to `(x1, y1)` inclusive, ignoring any part of it that falls off the board
+        """
+        self._sync()
+
+        x0 = max(x0, 0)
+        y0 = max(y0, 0)
+        x1 = min(x1, self._WIDTH - 1)
+        y1 = min(y1, self._HEIGHT - 1)
+        if x0 > x1 or y0 > y1:
+            return 0
+
+        table: array[int] = self._tables[species]
+        STRIDE: Final[int] = self._WIDTH + 1
+        return (
+            table[(y1 + 1) * STRIDE + x1 + 1]
+            - table[y0 * STRIDE + x1 + 1]
+            - table[(y1 + 1) * STRIDE + x0]
+            + table[y0 * STRIDE + x0]
+        )
+
+    def count_ring(self, species: int, centre: Coordinate, pseudoradius: int) -> int:
+        """
+        Returns the number of agents of `species` on the square ring of cells `pseudoradius` away from `centre` (i.e. the cells produced by `neighbourhood(centre, pseudoradius)` that are on the board)
+        """
+        (x, y) = centre
+        r: int = pseudoradius
+        return self.count(species, x - r, y - r, x + r, y + r) - self.count(
+            species, x - r + 1, y - r + 1, x + r - 1, y + r - 1
+        )
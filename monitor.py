@@ -0,0 +1,70 @@
+"""
+Watches a board that is running in another process, having been shared with `Board2D.share()`
+
+For example, with the board from `simulate.py --share run` (or `stream.py serve --share run`):
+
+```
+python monitor.py run --interval 1 --png latest.png
+```
+
+Every `--interval` seconds this prints out the latest stats of the board and (if `--png` is given) saves an image of it
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict, Sequence
+from model.shared import SharedBoardView
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+
+    parser = argparse.ArgumentParser(description="Watches a shared board as it runs")
+    parser.add_argument("name", help="the name of the shared memory block")
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--png", help="keep saving the latest state of the board here")
+    parser.add_argument("--img-width", type=int, default=500)
+    parser.add_argument("--img-height", type=int, default=500)
+    parser.add_argument("--once", action="store_true", help="only look once")
+    args = parser.parse_args(argv)
+
+    with SharedBoardView(args.name) as view:
+        try:
+            while True:
+                (stats, cells) = view.snapshot()
+
+                populations: Dict[int, int] = dict()
+                for species in cells:
+                    if species >= 0:
+                        populations[species] = populations.get(species, 0) + 1
+                print(
+                    f"round {stats.round}: {stats.moves} moves, "
+                    f"{stats.dissatisfied} dissatisfied at the start of the round, "
+                    f"populations {dict(sorted(populations.items()))}",
+                    flush=True,
+                )
+
+                # PIL is only needed (and imported) if we're drawing
+                if args.png is not None:
+                    from display import draw_cells
+
+                    draw_cells(
+                        cells,
+                        stats.width,
+                        stats.height,
+                        args.img_width,
+                        args.img_height,
+                    ).save(args.png)
+
+                if args.once:
+                    break
+                time.sleep(args.interval)
+
+        except KeyboardInterrupt:
+            pass
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
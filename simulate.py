@@ -0,0 +1,299 @@
+"""
+Runs a simulation without needing Jupyter, writing out the stats for every round and (optionally) an image of every round
+
+For example:
+
+```
+python simulate.py --board area --width 200 --height 200 --threshold 0.5 --rounds 500 --seed 1 --stats stats.csv
+```
+
+Run `python simulate.py --help` to see all of the options
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+from typing import (
+    Any,
+    Dict,
+    Final,
+    List,
+    Sequence,
+    TextIO,
+    Tuple,
+    TYPE_CHECKING,
+    cast,
+)
+from model.base import Board, Coordinate
+
+# `model.metrics` is imported once it's needed rather than up here, so that `stream.py` can share the argument parsing without loading it
+if TYPE_CHECKING:
+    from model.metrics import Metrics
+
+BOARD_TYPES: Final[List[str]] = ["area", "neighbourhood", "packed", "linear"]
+
+# Only boards which keep their cells in a flat array can move them into shared memory
+SHAREABLE_BOARD_TYPES: Final[List[str]] = ["area", "neighbourhood"]
+
+
+def make_board(args: argparse.Namespace) -> Board:
+    """
+    Creates the board described by the command-line arguments
+    """
+    kwargs: Dict[str, Any] = dict(
+        number_of_species=args.species,
+        threshold=args.threshold,
+        total_fill_proportion=args.fill,
+    )
+    if args.neighbourhood_size is not None:
+        kwargs["neighbourhood_size"] = args.neighbourhood_size
+
+    # The board modules are only imported once we know which one we need
+    if args.board == "linear":
+        from model.linear_model import Board1D
+
+        return Board1D(
+            size=args.width, max_travel_distance=args.max_travel_distance, **kwargs
+        )
+
+    kwargs["relocation"] = args.relocation
+    kwargs["summed_area_tables"] = args.summed_area_tables
+    kwargs["workers"] = args.workers
+    if args.proximity_bias is not None:
+        kwargs["proximity_bias"] = args.proximity_bias
+
+    if args.board == "neighbourhood":
+        from model.neighbourhood_model import BoardBN
+
+        return BoardBN(width=args.width, height=args.height, **kwargs)
+    elif args.board == "packed":
+        from model.packed_model import PackedBoard2D
+
+        return PackedBoard2D(width=args.width, height=args.height, **kwargs)
+    else:
+        from model.area_model import Board2D
+
+        return Board2D(width=args.width, height=args.height, **kwargs)
+
+
+def stats_header(number_of_species: int) -> List[str]:
+    from model.metrics import Metrics
+
+    header: List[str] = ["round", "moves"]
+    for field in Metrics._fields:
+        if field.endswith("_by_species"):
+            header += [
+                f"{field[: -len('_by_species')]}_{s}" for s in range(number_of_species)
+            ]
+        else:
+            header.append(field)
+    return header
+
+
+def stats_row(round: int, moves: int, metrics: "Metrics") -> List[Any]:
+    row: List[Any] = [round, moves]
+    for value in metrics:
+        if isinstance(value, tuple):
+            row += list(value)
+        else:
+            row.append(value)
+    return row
+
+
+def add_board_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Adds the arguments `make_board()` needs to `parser`
+    """
+    parser.add_argument("--board", choices=BOARD_TYPES, default="area")
+    parser.add_argument("--width", type=int, default=80)
+    parser.add_argument("--height", type=int, default=80)
+    parser.add_argument("--species", type=int, default=2)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--fill", type=float, default=0.7)
+    parser.add_argument("--neighbourhood-size", type=int, default=None)
+    parser.add_argument("--proximity-bias", type=float, default=None)
+    parser.add_argument("--max-travel-distance", type=int, default=None)
+    parser.add_argument(
+        "--relocation", choices=["random", "targeted"], default="random"
+    )
+    parser.add_argument("--summed-area-tables", action="store_true")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="split the read-only scans of each round across this many processes",
+    )
+    parser.add_argument(
+        "--share",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="NAME",
+        help="put the board in shared memory (under NAME, if given) so monitor.py can watch it",
+    )
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def check_board_arguments(
+    parser: argparse.ArgumentParser, args: argparse.Namespace
+) -> None:
+    """
+    Checks the arguments added by `add_board_arguments()` go together, exiting with an error from `parser` if they don't
+    """
+    if args.rounds < 0:
+        parser.error("--rounds can't be negative")
+    if args.board == "packed" and args.summed_area_tables:
+        parser.error("packed boards can't use --summed-area-tables")
+    if args.share is not None and args.board not in SHAREABLE_BOARD_TYPES:
+        parser.error(f"{args.board} boards can't use --share")
+    # The workers read the board from shared memory, so they need a board that can be shared too
+    if args.workers is not None and args.workers <= 0:
+        parser.error("--workers must be strictly positive")
+    if args.workers is not None and args.board not in SHAREABLE_BOARD_TYPES:
+        parser.error(f"{args.board} boards can't use --workers")
+    # A board given workers is put in shared memory as soon as it's made, under a name of its own
+    if args.share and args.workers is not None:
+        parser.error("--share can't be given a name when using --workers")
+
+
+def parse_args(argv: Sequence[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Runs Schelling's model of segregation without a notebook"
+    )
+    add_board_arguments(parser)
+    parser.add_argument(
+        "--until-satisfied",
+        action="store_true",
+        help="stop early once every agent is satisfied",
+    )
+    parser.add_argument("--stats", help="write the stats for every round to this CSV")
+    parser.add_argument(
+        "--metrics",
+        help="record the stats for every round as binary columns in this folder",
+    )
+    parser.add_argument("--history", help="record the run to this history file")
+    parser.add_argument("--keyframe-interval", type=int, default=100)
+    parser.add_argument("--frames", help="save an image of every round in this folder")
+    parser.add_argument("--img-width", type=int, default=500)
+    parser.add_argument("--img-height", type=int, default=500)
+
+    args: argparse.Namespace = parser.parse_args(argv)
+    check_board_arguments(parser, args)
+    return args
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+
+    args: argparse.Namespace = parse_args(argv)
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    from model.metrics import measure
+
+    board: Board = make_board(args)
+
+    stats_file: TextIO | None = None
+    writer = None
+    if args.stats is not None:
+        stats_file = open(args.stats, "w", newline="")
+        writer = csv.writer(stats_file)
+        writer.writerow(stats_header(board.get_number_of_species()))
+
+    recorder = None
+    if args.metrics is not None:
+        from model.recorder import MetricsRecorder
+
+        recorder = MetricsRecorder(args.metrics, board)
+
+    history = None
+    if args.history is not None:
+        from model.history import HistoryWriter
+
+        history = HistoryWriter(args.history, board, args.keyframe_interval)
+
+    # Drawing is the only thing that needs PIL, so we don't import it unless we have to
+    if args.frames is not None:
+        from display import draw_board
+
+        os.makedirs(args.frames, exist_ok=True)
+
+    # These are only filled in once the first round has been measured, which might not happen if the run is interrupted straight away
+    round: int = 0
+    metrics: "Metrics | None" = None
+
+    if args.share is not None:
+        name: str = cast(Any, board).share(args.share or None)
+        print(f"Sharing the board as {name}", file=sys.stderr)
+
+    try:
+        for round in range(args.rounds + 1):
+
+            # Round 0 is the board as it started out, before anyone has moved
+            moves: List[Tuple[Coordinate, Coordinate]] | None = None
+            if round > 0:
+                board.update()
+                moves = board.log[-1]
+
+                # Everything below is handed this round's moves directly, and drawing only looks at the latest entry of the log, so we throw the rest away to stop the log growing for the whole run
+                del board.log[:-1]
+
+                if history is not None:
+                    history.record(moves)
+
+            metrics = measure(board)
+            if writer is not None:
+                writer.writerow(
+                    stats_row(round, len(moves) if moves is not None else 0, metrics)
+                )
+
+            if recorder is not None:
+                recorder.record(moves, metrics)
+
+            if args.frames is not None:
+                draw_board(
+                    board=board,
+                    img_width=args.img_width,
+                    img_height=args.img_height,
+                    tail_length=1,
+                ).save(os.path.join(args.frames, f"round_{round:06d}.png"))
+
+            if (
+                args.until_satisfied
+                and metrics.get_total_satisfied() == board.get_total_population()
+            ):
+                break
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        if stats_file is not None:
+            stats_file.close()
+        if history is not None:
+            history.close()
+        if recorder is not None:
+            recorder.close()
+
+        # Boards that were shared (to be watched, or to be split across workers) have to hand back their shared memory, which also shuts any workers down. Only the boards that can be shared have anything to hand back
+        unshare = getattr(board, "unshare", None)
+        if unshare is not None:
+            unshare()
+
+    if metrics is None:
+        print("Stopped before the board was measured", file=sys.stderr)
+    else:
+        print(
+            f"Finished after {round} rounds: "
+            f"{metrics.get_total_satisfied()}/{board.get_total_population()} "
+            f"satisfied, mean conspecificity {metrics.mean_conspecificity:.3f}",
+            file=sys.stderr,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""
+Runs a simulation and streams it live to anyone who connects, without the simulation ever having to wait for them
+
+For example, to start a server and then watch it from another terminal:
+
+```
+python stream.py serve --width 200 --height 200 --rounds 1000 --port 8765
+python stream.py watch --port 8765 --png latest.png
+```
+
+The stream uses the same format as the history files written by `HistoryWriter`: a header, then a keyframe of the whole board every so often with the moves made in each round in between. Each client gets its own small queue of records to send, and if a client falls so far behind that its queue fills up, everything queued for it is dropped and it picks up again from the next keyframe
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import threading
+import time
+from array import array
+from typing import Final, List, Sequence, Set, cast
+from model.base import Board
+from model.history import (
+    HEADER,
+    RECORD,
+    Move,
+    apply_moves,
+    encode_delta,
+    encode_header,
+    encode_keyframe,
+)
+from model.area_model import Board2D, cell_typecode
+from simulate import add_board_arguments, check_board_arguments, make_board
+
+DEFAULT_PORT: Final[int] = 8765
+
+
+class Client:
+    """
+    A connected client, along with the records waiting to be sent to it
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter, max_queued: int):
+        self.writer: asyncio.StreamWriter = writer
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(max_queued)
+        self.waiting_for_keyframe: bool = False
+
+
+class FrameHub:
+    """
+    Hands out the records of a running simulation to all the connected clients. This lives entirely on the event loop's thread, and the simulation only ever talks to it through `publish()`
+    """
+
+    def __init__(self, header: bytes, typecode: str, max_queued: int):
+        self._header: Final[bytes] = header
+        self._TYPECODE: Final[str] = typecode
+        self._MAX_QUEUED: Final[int] = max_queued
+        self._clients: Set[Client] = set()
+
+        # Clients who join partway through get the latest keyframe and every round since, so they can catch up straight away
+        self._keyframe: bytes | None = None
+        self._since_keyframe: List[bytes] = list()
+
+    def publish(
+        self, round: int, moves: List[Move], cells: "array[int] | None"
+    ) -> None:
+        """
+        Encodes a round of the simulation (and a keyframe, if `cells` is given) and queues it up for every client
+        """
+        delta: bytes = encode_delta(round, moves)
+        self._since_keyframe.append(delta)
+        for client in self._clients:
+            self._offer(client, delta, is_keyframe=False)
+
+        if cells is not None:
+            self.publish_keyframe(round, cells)
+
+    def publish_keyframe(self, round: int, cells: "array[int]") -> None:
+        """
+        Encodes a keyframe of the board as it is at the end of `round` (without any moves) and queues it up for every client
+        """
+        self._keyframe = encode_keyframe(round, cells, self._TYPECODE)
+        self._since_keyframe = list()
+        for client in self._clients:
+            self._offer(client, self._keyframe, is_keyframe=True)
+
+    def _offer(self, client: Client, record: bytes, is_keyframe: bool) -> None:
+        if client.waiting_for_keyframe and not is_keyframe:
+            return
+        try:
+            client.queue.put_nowait(record)
+            client.waiting_for_keyframe = False
+        except asyncio.QueueFull:
+            # The client can't keep up, so we throw away everything it hasn't been sent yet. Moves only make sense on top of the rounds before them, so it has to wait for a keyframe before we can send it anything else
+            while not client.queue.empty():
+                client.queue.get_nowait()
+            client.waiting_for_keyframe = True
+            if is_keyframe:
+                self._offer(client, record, is_keyframe)
+
+    async def serve_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        client: Client = Client(writer, self._MAX_QUEUED)
+        if self._keyframe is None:
+            client.waiting_for_keyframe = True
+        else:
+            for record in [self._keyframe, *self._since_keyframe]:
+                self._offer(client, record, is_keyframe=record is self._keyframe)
+        self._clients.add(client)
+
+        try:
+            writer.write(self._header)
+            while True:
+                writer.write(await client.queue.get())
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._clients.discard(client)
+            writer.close()
+
+
+def simulate(
+    board: Board,
+    hub: FrameHub,
+    loop: asyncio.AbstractEventLoop,
+    rounds: int,
+    keyframe_interval: int,
+    delay: float,
+) -> None:
+    """
+    Runs the simulation, handing each round over to the event loop. This runs on its own thread so that encoding and sending never hold it up
+    """
+
+    def snapshot() -> "array[int]":
+        return array("i", board.get_cell_buffer())
+
+    loop.call_soon_threadsafe(hub.publish_keyframe, 0, snapshot())
+    for round in range(1, rounds + 1):
+        board.update()
+        loop.call_soon_threadsafe(
+            hub.publish,
+            round,
+            board.log[-1],
+            snapshot() if round % keyframe_interval == 0 else None,
+        )
+        # Each round is published as soon as it happens, so there's no need to keep the older ones
+        del board.log[:-1]
+        if delay > 0:
+            time.sleep(delay)
+
+    # We finish off with a keyframe so that anyone who was dropped near the end still gets to see how it ended
+    if rounds % keyframe_interval != 0:
+        loop.call_soon_threadsafe(hub.publish_keyframe, rounds, snapshot())
+
+    # Nothing else needs the board now, so if it was shared (to be watched, or given workers) the shared memory and any workers can be let go
+    if isinstance(board, Board2D):
+        board.unshare()
+    print("Simulation finished", file=sys.stderr)
+
+
+async def serve(args: argparse.Namespace) -> None:
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    board: Board = make_board(args)
+    if args.share is not None:
+        name: str = cast(Board2D, board).share(args.share or None)
+        print(f"Sharing the board as {name}", file=sys.stderr)
+
+    hub: FrameHub = FrameHub(
+        encode_header(board, args.keyframe_interval),
+        cell_typecode(board.get_number_of_species()),
+        args.max_queued,
+    )
+    server = await asyncio.start_server(hub.serve_client, args.host, args.port)
+    print(f"Streaming on {args.host}:{args.port}", file=sys.stderr)
+
+    threading.Thread(
+        target=simulate,
+        args=(
+            board,
+            hub,
+            asyncio.get_running_loop(),
+            args.rounds,
+            args.keyframe_interval,
+            args.delay,
+        ),
+        daemon=True,
+    ).start()
+
+    async with server:
+        await server.serve_forever()
+
+
+async def watch(args: argparse.Namespace) -> None:
+    """
+    Connects to a server and follows along with the simulation, printing out each round (and saving an image of it if asked to)
+    """
+    (reader, writer) = await asyncio.open_connection(args.host, args.port)
+
+    (_, _, width, height, _, typecode, move_kind) = HEADER.unpack(
+        await reader.readexactly(HEADER.size)
+    )
+    item_size: Final[int] = array(typecode.decode()).itemsize
+    cells: array[int] | None = None
+
+    try:
+        while True:
+            (tag, round, count) = RECORD.unpack(await reader.readexactly(RECORD.size))
+            if tag == b"K":
+                stored: array[int] = array(typecode.decode())
+                stored.frombytes(await reader.readexactly(count * item_size))
+                cells = array("i", stored)
+            else:
+                n: array[int] = array("I")
+                n.frombytes(await reader.readexactly(16 * count))
+                moves: List[Move] = [
+                    ((n[k], n[k + 1]), (n[k + 2], n[k + 3]))
+                    for k in range(0, len(n), 4)
+                ]
+                if cells is not None:
+                    apply_moves(cells, width, moves, move_kind)
+
+            if cells is None:
+                continue
+            print(
+                f"round {round} ({'keyframe' if tag == b'K' else f'{count} moves'})",
+                flush=True,
+            )
+            if args.png is not None:
+                from display import draw_cells
+
+                draw_cells(cells, width, height, args.img_width, args.img_height).save(
+                    args.png
+                )
+
+    except asyncio.IncompleteReadError:
+        pass
+    finally:
+        writer.close()
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+
+    parser = argparse.ArgumentParser(description="Streams a simulation as it runs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="run a simulation and stream it")
+    add_board_arguments(serve_parser)
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--keyframe-interval", type=int, default=20)
+    serve_parser.add_argument(
+        "--max-queued",
+        type=int,
+        default=64,
+        help="how many records a client can fall behind before being dropped",
+    )
+    serve_parser.add_argument(
+        "--delay", type=float, default=0.0, help="seconds to wait between rounds"
+    )
+
+    watch_parser = subparsers.add_parser("watch", help="watch a streamed simulation")
+    watch_parser.add_argument("--host", default="127.0.0.1")
+    watch_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    watch_parser.add_argument("--png", help="keep saving the latest state here")
+    watch_parser.add_argument("--img-width", type=int, default=500)
+    watch_parser.add_argument("--img-height", type=int, default=500)
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        check_board_arguments(serve_parser, args)
+        if args.keyframe_interval <= 0:
+            serve_parser.error("--keyframe-interval must be strictly positive")
+
+    try:
+        asyncio.run(serve(args) if args.command == "serve" else watch(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
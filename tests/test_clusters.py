@@ -0,0 +1,69 @@
+import random
+from collections import deque
+from typing import Deque, Dict, List
+from model.area_model import Board2D
+from model.clusters import ClusterTracker
+
+
+def flood_fill_sizes(board: Board2D) -> Dict[int, int]:
+    """
+    Works out the cluster size distribution of `board` the slow way
+    """
+    WIDTH: int = board.get_width()
+    cells = board.get_cell_buffer()
+    seen: List[bool] = [False] * len(cells)
+    sizes: Dict[int, int] = dict()
+
+    for start in range(len(cells)):
+        if cells[start] < 0 or seen[start]:
+            continue
+        seen[start] = True
+        frontier: Deque[int] = deque([start])
+        size: int = 0
+        while frontier:
+            i: int = frontier.popleft()
+            size += 1
+            for (j, ok) in [
+                (i - 1, i % WIDTH > 0),
+                (i + 1, i % WIDTH + 1 < WIDTH),
+                (i - WIDTH, i >= WIDTH),
+                (i + WIDTH, i + WIDTH < len(cells)),
+            ]:
+                if ok and not seen[j] and cells[j] == cells[start]:
+                    seen[j] = True
+                    frontier.append(j)
+        sizes[size] = sizes.get(size, 0) + 1
+
+    return dict(sorted(sizes.items()))
+
+
+def make_board(fill: float) -> Board2D:
+    return Board2D(
+        width=30,
+        height=30,
+        number_of_species=3,
+        threshold=0.5,
+        total_fill_proportion=fill,
+    )
+
+
+def test_matches_flood_fill_when_following_single_moves():
+    random.seed(1)
+    board = make_board(0.8)
+    tracker = ClusterTracker(board)
+    for _ in range(5):
+        board.update()
+        for move in board.log[-1]:
+            tracker.record([move])
+        assert tracker.get_size_distribution() == flood_fill_sizes(board)
+
+
+def test_matches_flood_fill_when_following_whole_rounds():
+    random.seed(2)
+    for fill in [0.5, 0.9]:
+        board = make_board(fill)
+        tracker = ClusterTracker(board)
+        for _ in range(5):
+            board.update()
+            tracker.sync()
+            assert tracker.get_size_distribution() == flood_fill_sizes(board)
@@ -0,0 +1,75 @@
+import os
+import random
+from array import array
+from typing import List
+import pytest
+from model.base import Board
+from model.area_model import Board2D
+from model.linear_model import Board1D
+from model.history import HistoryReader, HistoryWriter
+
+ROUNDS: int = 7
+
+
+def make_board(kind: str) -> Board:
+    if kind == "2d":
+        return Board2D(
+            width=20,
+            height=15,
+            number_of_species=2,
+            threshold=0.5,
+            total_fill_proportion=0.8,
+        )
+    return Board1D(
+        size=60, number_of_species=2, threshold=0.5, total_fill_proportion=0.8
+    )
+
+
+def run(board: Board, path: str, trim_log: bool) -> List["array[int]"]:
+    """
+    Records `ROUNDS` rounds of `board` to `path`, either by syncing with the log or by handing over each round and then trimming the log like `simulate.py` does, and returns the board as it was after every round
+    """
+    seen: List[array[int]] = [array("i", board.get_cell_buffer())]
+    with HistoryWriter(path, board, keyframe_interval=3) as history:
+        for _ in range(ROUNDS):
+            board.update()
+            if trim_log:
+                history.record(board.log[-1])
+                del board.log[:-1]
+            else:
+                history.sync()
+            seen.append(array("i", board.get_cell_buffer()))
+    return seen
+
+
+@pytest.mark.parametrize("kind", ["2d", "1d"])
+@pytest.mark.parametrize("trim_log", [False, True])
+def test_round_trip(tmp_path, kind: str, trim_log: bool):
+    random.seed(3)
+    board = make_board(kind)
+    path = os.path.join(tmp_path, "run.hist")
+    seen = run(board, path, trim_log)
+
+    with HistoryReader(path) as reader:
+        assert reader.get_number_of_rounds() == ROUNDS
+        # Going backwards means every round has to be rebuilt from a keyframe rather than from the last one looked at
+        for round in reversed(range(ROUNDS + 1)):
+            assert reader.get_cells(round) == seen[round]
+
+
+def test_reads_up_to_the_last_whole_record(tmp_path):
+    random.seed(4)
+    board = make_board("2d")
+    path = os.path.join(tmp_path, "run.hist")
+    seen = run(board, path, trim_log=True)
+
+    # Cutting the file off partway through the last delta loses the index as well as that round
+    with HistoryReader(path) as reader:
+        cut: int = reader._delta_offsets[-1] + 5
+    with open(path, "r+b") as file:
+        file.truncate(cut)
+
+    with HistoryReader(path) as reader:
+        assert reader.get_number_of_rounds() == ROUNDS - 1
+        for round in range(ROUNDS):
+            assert reader.get_cells(round) == seen[round]
@@ -0,0 +1,38 @@
+import random
+from typing import Type
+import pytest
+from model.area_model import Board2D
+from model.base import Board
+from model.metrics import measure
+from model.neighbourhood_model import BoardBN
+
+
+@pytest.mark.parametrize(
+    "board_type,neighbourhood_size", [(Board2D, 1), (Board2D, 3), (BoardBN, 4)]
+)
+def test_summed_area_tables_match_per_cell_counts(
+    board_type: Type[Board2D], neighbourhood_size: int
+):
+    def run(summed_area_tables: bool) -> Board2D:
+        random.seed(5)
+        board = board_type(
+            width=24,
+            height=16,
+            neighbourhood_size=neighbourhood_size,
+            number_of_species=3,
+            threshold=0.4,
+            total_fill_proportion=0.7,
+            summed_area_tables=summed_area_tables,
+        )
+        for _ in range(4):
+            board.update()
+        return board
+
+    counted: Board2D = run(summed_area_tables=True)
+    looped: Board2D = run(summed_area_tables=False)
+
+    assert counted.log == looped.log
+    for xy in counted.get_all_cells():
+        if counted[xy] is not None:
+            assert counted.conspecificity(xy) == Board.conspecificity(counted, xy)
+    assert measure(counted) == measure(looped)